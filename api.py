@@ -1,55 +1,203 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import os
-import pandas as pd
+import shutil
+import json
+import importlib
+import threading
 import numpy as np
-from flask import Flask, request, jsonify
-import joblib
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.naive_bayes import GaussianNB
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+from flask import Flask, Blueprint, request, jsonify, Response, stream_with_context, g
+# pandas et scikit-learn sont importés à la demande (chargement des données, entraînement, prédiction)
+# pour que l'import de ce module reste rapide, y compris dans les tests et les serveurs préforkés.
+from model_registry import ModelRegistry
+from training_jobs import JobManager, JobQueueFull
+from parallel_training import run_parallel
+from data_cache import data_fingerprint, load_split, save_split
+from artifacts import build_artifact, is_artifact, dump_artifact, load_artifact, model_copy, atomic_write_json, file_lock, LazyArtifact
+from memory_usage import process_memory, mapped_files
+from api_metrics import MetricsRegistry
+from compiled_models import compile_model, predict_compiled, verify_compiled
+from fast_predict import parse_features, scaler_params, scale_row, scale_matrix
+from micro_batching import MicroBatcher
+from streaming_training import train_streaming
+from data_ingest import append_rows
+from cross_validation import cross_validate
+from knn_index import build_index, KNNIndex, recall_report
+from tuning import tuning_key, validate_grid, load_cached, save_cached, run_search
+from prediction_cache import PredictionCache, parse_precision
+from model_manifest import ManifestCache, read_manifest, update_manifest
 
 # --- Configuration ---
-app = Flask(__name__)
+bp = Blueprint('pollution_api', __name__)
 DATA_PATH = '../data/pollution.csv'
 MODELS_DIR = '../models'
-os.makedirs(MODELS_DIR, exist_ok=True)
+CACHE_DIR = '../cache'
+
+# Nombre maximal de modèles gardés en mémoire par le registre (politique LRU)
+MODEL_REGISTRY_SIZE = int(os.environ.get('MODEL_REGISTRY_SIZE', 6))
+# Modèles projetés en mémoire en lecture seule (pages partagées par tous les workers), estimateur
+# scikit-learn à part et chargé à la demande quand le moteur compilé ou l'index de voisins suffit
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '1') == '1'
+registry = ModelRegistry(MODELS_DIR, max_size=MODEL_REGISTRY_SIZE,
+                         loader=lambda path: load_artifact(path, mmap=MODEL_MMAP))
 
-# Liste des modèles disponibles
+# Tâches d'entraînement exécutées en arrière-plan dans des processus séparés. Leur état est partagé
+# par les workers gunicorn (CACHE_DIR/jobs) et les limites valent pour toute la machine.
+MAX_CONCURRENT_JOBS = int(os.environ.get('MAX_CONCURRENT_JOBS', 2))
+MAX_PENDING_JOBS = int(os.environ.get('MAX_PENDING_JOBS', 20))
+jobs = JobManager(os.path.join(CACHE_DIR, 'jobs'), max_concurrent=MAX_CONCURRENT_JOBS, max_pending=MAX_PENDING_JOBS)
+
+# Liste des modèles disponibles: (module, classe, paramètres)
+# Le module scikit-learn d'un estimateur n'est importé que lorsque ce modèle est entraîné.
 MODELS = {
-    'KNN': KNeighborsClassifier(),
-    'DecisionTree': DecisionTreeClassifier(random_state=42),
-    'RandomForest': RandomForestClassifier(random_state=42),
-    'LogisticRegression': LogisticRegression(max_iter=1000, random_state=42),
-    'SVM': SVC(random_state=42),
-    'NaiveBayes': GaussianNB()
+    'KNN': ('sklearn.neighbors', 'KNeighborsClassifier', {}),
+    'DecisionTree': ('sklearn.tree', 'DecisionTreeClassifier', {'random_state': 42}),
+    'RandomForest': ('sklearn.ensemble', 'RandomForestClassifier', {'random_state': 42}),
+    'LogisticRegression': ('sklearn.linear_model', 'LogisticRegression', {'max_iter': 1000, 'random_state': 42}),
+    'SVM': ('sklearn.svm', 'SVC', {'random_state': 42}),
+    'NaiveBayes': ('sklearn.naive_bayes', 'GaussianNB', {})
+}
+
+# Grilles par défaut de /tune (recherche par divisions successives); une grille peut être fournie dans la requête
+TUNING_GRIDS = {
+    'KNN': {'n_neighbors': [3, 5, 7, 11, 15, 21, 31], 'weights': ['uniform', 'distance'], 'p': [1, 2]},
+    'DecisionTree': {'max_depth': [None, 5, 10, 20, 40], 'min_samples_leaf': [1, 2, 5, 10, 20],
+                     'criterion': ['gini', 'entropy']},
+    'RandomForest': {'n_estimators': [100, 200, 400], 'max_depth': [None, 10, 20],
+                     'min_samples_leaf': [1, 2, 5], 'max_features': ['sqrt', 'log2', None]},
+    'LogisticRegression': {'C': [0.001, 0.01, 0.1, 1, 10, 100, 1000]},
+    'SVM': {'C': [0.1, 1, 10, 100], 'gamma': ['scale', 0.001, 0.01, 0.1, 1], 'kernel': ['rbf', 'linear']},
+    'NaiveBayes': {'var_smoothing': [1e-12, 1e-11, 1e-10, 1e-9, 1e-8, 1e-7, 1e-6]}
+}
+
+# Index de voisins du modèle KNN, construit à l'entraînement et servi en mmap: 'kd_tree', 'ball_tree'
+# (exacts), 'ivf' (approché, pour des millions de lignes: KNN_IVF_LISTS listes, KNN_IVF_NPROBE sondées) ou 'none'
+KNN_INDEX = os.environ.get('KNN_INDEX', 'kd_tree')
+KNN_IVF_LISTS = int(os.environ.get('KNN_IVF_LISTS', 0))
+KNN_IVF_NPROBE = int(os.environ.get('KNN_IVF_NPROBE', 8))
+
+# Modèles entraînables en mode 'streaming' (partial_fit, fichier lu par blocs sans être chargé en mémoire):
+# la régression logistique et le SVM linéaire y sont remplacés par leur équivalent SGD.
+STREAMING_MODELS = {
+    'NaiveBayes': ('sklearn.naive_bayes', 'GaussianNB', {}),
+    'LogisticRegression': ('sklearn.linear_model', 'SGDClassifier', {'loss': 'log_loss', 'alpha': 1e-3, 'average': True, 'random_state': 42}),
+    'SVM': ('sklearn.linear_model', 'SGDClassifier', {'loss': 'hinge', 'alpha': 1e-3, 'average': True, 'random_state': 42})
 }
+# Lignes lues à la fois et nombre de passages d'entraînement du mode 'streaming'
+STREAM_TRAIN_CHUNK_ROWS = int(os.environ.get('STREAM_TRAIN_CHUNK_ROWS', 100000))
+STREAM_TRAIN_EPOCHS = int(os.environ.get('STREAM_TRAIN_EPOCHS', 5))
 
 # Variables globales pour les données et le scaler
+X_clean, y_clean = None, None
 X_train, X_test, y_train, y_test = None, None, None, None
 scaler = None
+DATA_FINGERPRINT = None
 FEATURES = ['Temperature', 'Humidity', 'PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'Proximite_zones_industrielles', 'Densite_population']
 TARGET = 'Qualite_air'
+QUALITY_MAP = {0: 'Bonne', 1: 'Modérée', 2: 'Mauvaise', 3: 'Dangereuse'}
+
+# Nombre maximal de lignes acceptées par /predict/batch
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+
+# Nombre de lignes lues, mises à l'échelle et prédites à la fois par /predict/stream
+STREAM_CHUNK_ROWS = int(os.environ.get('STREAM_CHUNK_ROWS', 5000))
+
+# Micro-batching optionnel de /predict: regroupe les requêtes concurrentes d'un même modèle
+# arrivées dans une fenêtre de MICRO_BATCH_WINDOW_MS ms (ou jusqu'à MICRO_BATCH_MAX_ROWS lignes)
+MICRO_BATCH_ENABLED = os.environ.get('MICRO_BATCH_ENABLED', '0') == '1'
+MICRO_BATCH_WINDOW_MS = float(os.environ.get('MICRO_BATCH_WINDOW_MS', 2.0))
+MICRO_BATCH_MAX_ROWS = int(os.environ.get('MICRO_BATCH_MAX_ROWS', 64))
+
+# Cache optionnel des résultats de /predict, indexé par (modèle, version, caractéristiques arrondies).
+# PREDICTION_CACHE_DECIMALS: décimales par caractéristique, ex. "PM2.5=1,CO=1" (les autres restent exactes)
+PREDICTION_CACHE_ENABLED = os.environ.get('PREDICTION_CACHE_ENABLED', '0') == '1'
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 300))
+PREDICTION_CACHE_DECIMALS = os.environ.get('PREDICTION_CACHE_DECIMALS', '')
+
+# Préchauffage optionnel au démarrage: chaque modèle entraîné est chargé puis reçoit WARMUP_ITERATIONS
+# prédictions synthétiques (une ligne et un lot de WARMUP_BATCH_ROWS lignes); /ready répond 503 d'ici là
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', '0') == '1'
+WARMUP_ITERATIONS = int(os.environ.get('WARMUP_ITERATIONS', 20))
+WARMUP_BATCH_ROWS = int(os.environ.get('WARMUP_BATCH_ROWS', 64))
+
+# --- Métriques (exposées par /metrics au format Prometheus) ---
+metrics = MetricsRegistry()
+REQUESTS_TOTAL = metrics.counter('pollution_api_requests_total', "Nombre de requêtes HTTP traitées.", ('route', 'method', 'status'))
+ERRORS_TOTAL = metrics.counter('pollution_api_request_errors_total', "Nombre de requêtes HTTP terminées en erreur (statut >= 400).", ('route', 'method', 'status'))
+REQUEST_LATENCY = metrics.histogram('pollution_api_request_duration_seconds', "Durée de traitement des requêtes HTTP.", ('route', 'method'))
+MODEL_REQUESTS_TOTAL = metrics.counter('pollution_api_model_requests_total', "Nombre de requêtes par route et par modèle.", ('route', 'model_name', 'status'))
+MODEL_LATENCY = metrics.histogram('pollution_api_model_request_duration_seconds', "Durée des requêtes par route et par modèle.", ('route', 'model_name'))
+PREDICT_PHASE_LATENCY = metrics.histogram('pollution_api_predict_phase_duration_seconds', "Durée de chaque phase de /predict (parse, model_load, transform, predict, serialize).", ('model_name', 'phase'))
+
+def _micro_batch_gauge():
+    if micro_batcher is None:
+        return {}
+    stats = micro_batcher.stats()
+    return {
+        ('batches',): stats['batches'],
+        ('rows',): stats['rows'],
+        ('mean_rows_per_batch',): stats['mean_rows_per_batch'],
+        ('queue_wait_ms_p50',): stats['queue_wait_ms']['p50'],
+        ('queue_wait_ms_p99',): stats['queue_wait_ms']['p99']
+    }
+
+metrics.gauge('pollution_api_micro_batch', "Micro-batching de /predict: lots, lignes, taille moyenne des lots et attente en file (ms).",
+              _micro_batch_gauge, ('stat',))
+metrics.gauge('pollution_api_prediction_cache', "Cache des prédictions de /predict: succès, échecs, taille et mémoire estimée (octets).",
+              lambda: {} if prediction_cache is None else
+              {(key,): value for key, value in prediction_cache.stats().items() if isinstance(value, (int, float))},
+              ('stat',))
+metrics.gauge('pollution_api_warmup_seconds', "Durée du préchauffage de chaque modèle au démarrage.",
+              lambda: {(name,): m['seconds'] for name, m in WARMUP_STATUS['models'].items() if 'seconds' in m},
+              ('model_name',))
+metrics.gauge('pollution_api_model_registry', "Compteurs et taille du registre de modèles en mémoire.",
+              lambda: {(key,): value for key, value in registry.stats().items() if isinstance(value, (int, float))},
+              ('stat',))
+
+# État du démarrage: chargement des données (éventuellement en arrière-plan) et durées mesurées
+data_ready = threading.Event()
+DATA_STATUS = {'state': 'pending', 'message': None}
+STARTUP_TIMINGS = {'imports': None, 'create_app': None, 'data_load': None, 'data_source': None, 'warmup': None}
+# Préchauffage des modèles: /ready attend warmup_done (posé immédiatement si le préchauffage est désactivé)
+warmup_done = threading.Event()
+WARMUP_STATUS = {'state': 'pending', 'models': {}}
 
 # --- Fonctions de Prétraitement ---
 
 def load_and_preprocess_data():
-    """Charge, nettoie et prépare les données pour l'entraînement."""
-    global X_train, X_test, y_train, y_test, scaler
+    """
+    Charge, nettoie et prépare les données pour l'entraînement.
+
+    Le résultat (données nettoyées, indices de séparation, matrices mises à l'échelle et scaler)
+    est mis en cache dans CACHE_DIR, indexé par l'empreinte de DATA_PATH: les démarrages suivants
+    projettent simplement les fichiers .npy en mémoire au lieu de tout recalculer.
+    """
+    global X_clean, y_clean, X_train, X_test, y_train, y_test, scaler, DATA_FINGERPRINT
     
     try:
-        df = pd.read_csv(DATA_PATH)
+        DATA_FINGERPRINT = data_fingerprint(CACHE_DIR, DATA_PATH)
     except FileNotFoundError:
         return False, "Fichier de données non trouvé."
 
-    # Nettoyage simple: Remplacer les NaN par la médiane
-    for col in df.columns:
-        if df[col].dtype in ['float64', 'int64']:
-            df[col].fillna(df[col].median(), inplace=True)
+    cached = load_split(CACHE_DIR, DATA_FINGERPRINT)
+    if cached is not None:
+        X_clean, y_clean = cached['X'], cached['y']
+        X_train, X_test, y_train, y_test = cached['X_train'], cached['X_test'], cached['y_train'], cached['y_test']
+        scaler = cached['scaler']
+        STARTUP_TIMINGS['data_source'] = 'cache'
+        return True, "Données prétraitées chargées depuis le cache."
+
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    df = pd.read_csv(DATA_PATH)
+
+    # Nettoyage simple: Remplacer les NaN par la médiane (toutes les colonnes numériques en une fois)
+    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
             
     # Supprimer les lignes avec des valeurs aberrantes (simplement pour éviter les erreurs d'entraînement)
     # Dans un vrai projet, on ferait un traitement plus sophistiqué
@@ -58,80 +206,972 @@ def load_and_preprocess_data():
     X = df[FEATURES]
     y = df[TARGET]
     
-    # Séparation des données
-    X_train_raw, X_test_raw, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    # Séparation des données (sur les indices, pour pouvoir les mettre en cache)
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42, stratify=y)
     
     # Mise à l'échelle
     scaler = StandardScaler()
-    X_train = scaler.fit_transform(X_train_raw)
-    X_test = scaler.transform(X_test_raw)
+    X_train = scaler.fit_transform(X.iloc[train_idx])
+    X_test = scaler.transform(X.iloc[test_idx])
+    X_clean, y_clean = X.to_numpy(), y.to_numpy()
+    y_train, y_test = y_clean[train_idx], y_clean[test_idx]
+
+    save_split(CACHE_DIR, DATA_FINGERPRINT, {
+        'X': X_clean, 'y': y_clean, 'train_idx': train_idx, 'test_idx': test_idx,
+        'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test
+    }, scaler)
+    STARTUP_TIMINGS['data_source'] = 'csv'
     
     return True, "Données chargées et prétraitées avec succès."
 
-# Charger les données au démarrage de l'API
-success, message = load_and_preprocess_data()
-if not success:
-    print(f"Erreur au chargement des données: {message}")
-    exit()
+def refresh_data_if_changed():
+    """
+    Recharge les données si DATA_PATH a changé depuis leur chargement (lignes ajoutées par /ingest).
+
+    Appelée au début des tâches d'entraînement (dans leur propre processus), et par /tune avant de
+    publier un résultat mis en cache.
+    """
+    if DATA_FINGERPRINT is None or data_fingerprint(CACHE_DIR, DATA_PATH) != DATA_FINGERPRINT:
+        success, message = load_and_preprocess_data()
+        if not success:
+            raise RuntimeError(message)
+
+def _load_data():
+    """Charge les données et publie le signal de disponibilité (data_ready / DATA_STATUS)."""
+    DATA_STATUS['state'] = 'loading'
+    start = time.perf_counter()
+    try:
+        success, message = load_and_preprocess_data()
+    except Exception as e:
+        success, message = False, f"{type(e).__name__}: {e}"
+    STARTUP_TIMINGS['data_load'] = time.perf_counter() - start
+    DATA_STATUS.update(state='ready' if success else 'failed', message=message)
+    if success:
+        data_ready.set()
+    else:
+        # Sans données, l'API reste utilisable pour la prédiction: chaque artefact embarque son propre scaler
+        print(f"Erreur au chargement des données: {message} L'entraînement est désactivé.")
+
+def start_data_loading(background=True):
+    """Lance le chargement des données, dans un thread d'arrière-plan par défaut."""
+    if background:
+        threading.Thread(target=_load_data, name='data-loader', daemon=True).start()
+    else:
+        _load_data()
+
+def warm_up_models():
+    """
+    Charge chaque modèle entraîné de MODELS_DIR et lui fait prédire des lignes synthétiques (tirées autour de la
+    moyenne de son scaler), par le même chemin que /predict et /predict/batch: chargement, imports paresseux et
+    premières allocations sont payés au démarrage plutôt que par les premières requêtes. Publie warmup_done.
+    """
+    WARMUP_STATUS['state'] = 'running'
+    start = time.perf_counter()
+    for model_name in sorted(f[:-len('.pkl')] for f in os.listdir(MODELS_DIR) if f.endswith('.pkl')):
+        model_start = time.perf_counter()
+        try:
+            artifact = get_artifact(model_name)
+            mean, scale = artifact_scaling(artifact)
+            loaded = time.perf_counter()
+            predict_with_artifact(artifact, scale_row(synthetic_rows(artifact, 1)[0], mean, scale))
+            first = time.perf_counter()
+            inference = measure_inference(artifact, WARMUP_ITERATIONS, WARMUP_BATCH_ROWS)
+            WARMUP_STATUS['models'][model_name] = {
+                'version': artifact['version'],
+                'load_seconds': loaded - model_start,
+                'first_predict_seconds': first - loaded,
+                'warm_predict_us': inference['single_row_us'],
+                'batch_row_us': inference['batch_row_us'],
+                'seconds': time.perf_counter() - model_start
+            }
+        except Exception as e:
+            # Un modèle illisible n'empêche pas l'API d'être prête: il sera signalé à sa première requête
+            WARMUP_STATUS['models'][model_name] = {'error': f"{type(e).__name__}: {e}",
+                                                   'seconds': time.perf_counter() - model_start}
+    STARTUP_TIMINGS['warmup'] = time.perf_counter() - start
+    WARMUP_STATUS['state'] = 'done'
+    warmup_done.set()
+
+def start_warm_up(background=True):
+    """Lance le préchauffage des modèles (thread d'arrière-plan par défaut), ou le marque terminé s'il est désactivé."""
+    if not WARMUP_ENABLED:
+        WARMUP_STATUS['state'] = 'disabled'
+        warmup_done.set()
+    elif background:
+        threading.Thread(target=warm_up_models, name='model-warmup', daemon=True).start()
+    else:
+        warm_up_models()
+
+def data_unavailable_response():
+    """Réponse d'erreur si les données d'entraînement ne sont pas (encore) disponibles, sinon None."""
+    if data_ready.is_set():
+        return None
+    if DATA_STATUS['state'] == 'failed':
+        return jsonify({"error": f"Données non chargées: {DATA_STATUS['message']}"}), 500
+    return jsonify({"error": "Données en cours de chargement. Réessayez dans quelques instants."}), 503
+
+def build_estimator(model_name, specs=MODELS):
+    """
+    Crée une nouvelle instance non entraînée de l'estimateur, en important son module à la demande.
+
+    Chaque entraînement ajuste sa propre instance: aucun estimateur n'est partagé entre requêtes,
+    threads ou tâches concurrentes.
+    """
+    module_name, class_name, params = specs[model_name]
+    estimator_class = getattr(importlib.import_module(module_name), class_name)
+    return estimator_class(**params)
 
 # --- API Endpoints ---
 
-@app.route('/models', methods=['GET'])
+def _model_label(model_name):
+    """Étiquette de modèle pour les métriques (bornée aux modèles connus pour limiter la cardinalité)."""
+    return model_name if model_name in MODELS else 'other'
+
+@bp.before_app_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@bp.after_app_request
+def _record_request_metrics(response):
+    # Pour les réponses diffusées (/predict/stream), la durée mesurée est celle jusqu'au premier octet
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    status = str(response.status_code)
+    REQUESTS_TOTAL.inc(route, request.method, status)
+    REQUEST_LATENCY.observe(elapsed, route, request.method)
+    if response.status_code >= 400:
+        ERRORS_TOTAL.inc(route, request.method, status)
+    model_name = g.get('model_name')
+    if model_name is not None:
+        MODEL_REQUESTS_TOTAL.inc(route, _model_label(model_name), status)
+        MODEL_LATENCY.observe(elapsed, route, _model_label(model_name))
+    return response
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Compteurs et histogrammes de latence du processus, au format texte Prometheus."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/health', methods=['GET'])
+def health():
+    """État de l'API: disponibilité des données et durées de démarrage."""
+    return jsonify({
+        "status": "ok",
+        "data": {**DATA_STATUS, "ready": data_ready.is_set()},
+        "startup_timings": STARTUP_TIMINGS
+    })
+
+@bp.route('/ready', methods=['GET'])
+def ready():
+    """Disponibilité pour le trafic (sonde de readiness): 503 tant que le préchauffage des modèles n'est pas terminé."""
+    body = {"ready": warmup_done.is_set(), "warmup": {**WARMUP_STATUS, "seconds": STARTUP_TIMINGS['warmup']}}
+    return jsonify(body), 200 if body['ready'] else 503
+
+@bp.route('/memory', methods=['GET'])
+def memory():
+    """
+    Mémoire résidente (RSS), proportionnelle (PSS), partagée et privée du processus qui répond,
+    et, par modèle chargé, celle de ses fichiers projetés en mémoire.
+    """
+    return jsonify({**process_memory(), 'models': model_memory()})
+
+def model_memory():
+    """
+    Mémoire des modèles du registre: pages de leurs fichiers projetés (artefact, index de voisins) résidentes
+    dans ce processus, dont celles partagées avec les autres workers, et estimateur chargé ou non.
+    """
+    models_dir = os.path.realpath(MODELS_DIR)
+    files = mapped_files(prefix=models_dir + os.sep)
+    report = {}
+    for model_name, artifact in registry.loaded().items():
+        usage = {'rss_kb': 0, 'pss_kb': 0, 'shared_kb': 0, 'private_kb': 0, 'files': 0}
+        for path, file_usage in files.items():
+            relative = os.path.relpath(path, models_dir)
+            if relative.startswith((f'{model_name}.pkl', f'{model_name}.index-', f'{model_name}.estimator-')):
+                for key in ('rss_kb', 'pss_kb', 'shared_kb', 'private_kb'):
+                    usage[key] += file_usage[key]
+                usage['files'] += 1
+        report[model_name] = {
+            'mapped': usage,
+            'estimator_loaded': artifact.model_loaded() if isinstance(artifact, LazyArtifact) else True
+        }
+    return report
+
+def synthetic_rows(artifact, n_rows, seed=0):
+    """Lignes synthétiques tirées autour de la moyenne du scaler de l'artefact (non mises à l'échelle)."""
+    mean, scale = artifact_scaling(artifact)
+    return mean + scale * np.random.default_rng(seed).standard_normal((n_rows, len(mean)))
+
+def measure_inference(artifact, iterations=20, batch_rows=64):
+    """Latence d'inférence de l'artefact (µs): médiane ligne par ligne, et par ligne dans un lot de batch_rows lignes."""
+    mean, scale = artifact_scaling(artifact)
+    rows = synthetic_rows(artifact, batch_rows)
+    predict_with_artifact(artifact, scale_row(rows[0], mean, scale))
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        predict_with_artifact(artifact, scale_row(rows[i % len(rows)], mean, scale))
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    predict_with_artifact(artifact, scale_matrix(rows, mean, scale))
+    return {'single_row_us': float(np.median(latencies) * 1e6),
+            'batch_row_us': (time.perf_counter() - start) / len(rows) * 1e6}
+
+def manifest_entry(artifact, model_file=None):
+    """Entrée du manifeste d'un artefact publié: fichiers, entraînement, métriques et latence d'inférence."""
+    model_name = artifact['model_name']
+    files = [f'{model_name}.pkl'] + ([model_file] if model_file else [])
+    size = sum(os.path.getsize(os.path.join(MODELS_DIR, name)) for name in files)
+    index = artifact.get('knn_index')
+    if index:
+        index_dir = os.path.join(MODELS_DIR, index['dir'])
+        size += sum(os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir))
+    return {
+        'name': model_name,
+        'version': artifact['version'],
+        'trained_at': artifact['trained_at'],
+        'size_bytes': size,
+        'fit_seconds': artifact.get('fit_seconds'),
+        'training_mode': artifact.get('training_mode', 'batch'),
+        'metrics': artifact['metrics'],
+        'data_fingerprint': artifact['data_fingerprint'],
+        'compiled': artifact.get('compiled') is not None,
+        'knn_index': index['method'] if index else None,
+        'inference': measure_inference(artifact)
+    }
+
+def rebuild_manifest():
+    """Entrées du manifeste des modèles déjà présents dans MODELS_DIR (création du manifeste)."""
+    entries = {}
+    for filename in sorted(f for f in os.listdir(MODELS_DIR) if f.endswith('.pkl')):
+        model_name = filename[:-len('.pkl')]
+        try:
+            artifact = load_artifact(os.path.join(MODELS_DIR, filename))
+        except Exception:
+            continue
+        if is_artifact(artifact):
+            entries[model_name] = manifest_entry(artifact, artifact.get('model_file'))
+        else:
+            # Ancien format (estimateur seul): pas de métadonnées
+            entries[model_name] = {'name': model_name, 'version': None,
+                                   'size_bytes': os.path.getsize(os.path.join(MODELS_DIR, filename))}
+    return entries
+
+# Manifeste servi par /models depuis la mémoire (relu seulement quand un entraînement le met à jour)
+models_manifest = ManifestCache(MODELS_DIR, lambda manifest: {
+    'trained': sorted(manifest['models']),
+    'available_for_training': list(MODELS.keys()),
+    'models': manifest['models']
+}, rebuild=rebuild_manifest)
+
+@bp.route('/models', methods=['GET'])
 def list_models():
-    """Liste les modèles disponibles (entraînés et non entraînés)."""
-    trained_models = [f.replace('.pkl', '') for f in os.listdir(MODELS_DIR) if f.endswith('.pkl')]
-    available_models = list(MODELS.keys())
-    
-    status = {
-        'trained': trained_models,
-        'available_for_training': available_models
+    """
+    Liste les modèles disponibles (entraînés et non entraînés), avec le manifeste des modèles entraînés.
+
+    La réponse porte un ETag: un client qui renvoie If-None-Match reçoit 304 tant que rien n'a changé.
+    """
+    body, etag = models_manifest.get()
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@bp.route('/models/registry', methods=['GET'])
+def registry_stats():
+    """Statistiques du registre de modèles en mémoire (succès, échecs, rechargements)."""
+    return jsonify(registry.stats())
+
+def evaluate_model(model, X_eval, y_eval):
+    """Calcule les métriques de classification d'un modèle entraîné."""
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+    y_pred = model.predict(X_eval)
+    return {
+        'accuracy': accuracy_score(y_eval, y_pred),
+        'precision': precision_score(y_eval, y_pred, average='weighted', zero_division=0),
+        'recall': recall_score(y_eval, y_pred, average='weighted', zero_division=0),
+        'f1_score': f1_score(y_eval, y_pred, average='weighted', zero_division=0),
+        'confusion_matrix': confusion_matrix(y_eval, y_pred).tolist()
     }
-    return jsonify(status)
 
-@app.route('/train', methods=['POST'])
+def save_model(model_name, model, metrics, model_scaler=None, fingerprint=None, knn_queries=None, **extra):
+    """
+    Sauvegarde un modèle entraîné dans MODELS_DIR sous forme d'artefact d'inférence
+    (modèle + scaler + ordre des caractéristiques + étiquettes + métriques + empreinte des données).
+
+    Par défaut, le scaler et l'empreinte sont ceux des données chargées en mémoire. knn_queries: lignes
+    mises à l'échelle hors de l'entraînement, pour contrôler l'index de voisins d'un modèle KNN.
+    Le cache des prédictions n'est pas vidé ici (cette fonction s'exécute dans le processus de la tâche):
+    les workers qui servent /predict écartent les entrées de l'ancienne version dès qu'ils chargent la nouvelle.
+    """
+    if type(model).__name__ == 'KNeighborsClassifier' and KNN_INDEX != 'none':
+        extra['knn_index'] = export_knn_index(model_name, model, knn_queries)
+    artifact = build_artifact(model_name, model, model_scaler if model_scaler is not None else scaler,
+                              FEATURES, QUALITY_MAP, metrics, fingerprint or DATA_FINGERPRINT, **extra)
+    # Publication atomique: le registre ne peut jamais charger un fichier partiellement écrit
+    model_file = dump_artifact(artifact, registry.model_path(model_name), separate_model=MODEL_MMAP)
+    remove_old_files(f'{model_name}.estimator-', keep=model_file)
+    remove_old_files(f'{model_name}.index-', keep=(extra.get('knn_index') or {}).get('dir'))
+    update_manifest(MODELS_DIR, model_name, manifest_entry(artifact, model_file), rebuild=rebuild_manifest)
+    return artifact
+
+def export_compiled(model, X_check):
+    """
+    Compile le modèle pour le moteur NumPy et vérifie ses prédictions contre scikit-learn.
+
+    La version compilée n'est conservée que si elle reproduit exactement scikit-learn sur X_check.
+    """
+    compiled = compile_model(model)
+    if compiled is None:
+        return {'compiled': None, 'compiled_agreement': None}
+    agreement = verify_compiled(compiled, model, np.asarray(X_check))
+    return {'compiled': compiled if agreement == 1.0 else None, 'compiled_agreement': agreement}
+
+def export_knn_index(model_name, model, X_queries=None):
+    """
+    Construit l'index de voisins d'un KNeighborsClassifier entraîné dans MODELS_DIR/<nom>.index-<horodatage>.
+
+    Un index exact n'est servi que s'il reproduit exactement model.predict sur les requêtes de contrôle; un
+    index 'ivf' est servi avec son rappel face à la recherche exacte. Les requêtes de contrôle sont des lignes
+    hors de l'entraînement (X_queries, déjà mises à l'échelle, ex. le jeu de test); sans elles (modèle
+    réajusté sur toutes les données), un échantillon des points indexés est utilisé en leave-one-out.
+    Retourne la description de l'index (conservée dans l'artefact), ou None s'il n'est pas utilisable.
+    """
+    # Distance de Minkowski du modèle (scikit-learn remplace p=1 et p=2 par 'manhattan' et 'euclidean')
+    p = {'manhattan': 1, 'euclidean': 2}.get(model.effective_metric_)
+    if model.effective_metric_ == 'minkowski':
+        p = model.effective_metric_params_.get('p', 2)
+    if p is None or model.weights not in ('uniform', 'distance'):
+        return None
+    # L'index approché ne calcule que des distances euclidiennes
+    method = 'kd_tree' if KNN_INDEX == 'ivf' and p != 2 else KNN_INDEX
+
+    X_fit, y_fit = model._fit_X, model.classes_[model._y]
+    dirname = f'{model_name}.index-{time.time_ns() // 1000}'
+    path = os.path.join(MODELS_DIR, dirname)
+    build_seconds = build_index(path, X_fit, y_fit, method=method, leaf_size=model.leaf_size, p=p,
+                                n_lists=KNN_IVF_LISTS or None)
+    index = KNNIndex(path)
+
+    rng = np.random.default_rng(42)
+    self_ids = None
+    if X_queries is not None and len(X_queries):
+        X_check = np.asarray(X_queries, dtype=np.float64)
+        X_check = X_check[rng.choice(len(X_check), min(len(X_check), 1000), replace=False)]
+    else:
+        self_ids = rng.choice(len(X_fit), min(len(X_fit), 1000), replace=False)
+        X_check = X_fit[self_ids]
+    info = {'dir': dirname, 'method': method, 'n_neighbors': int(model.n_neighbors), 'weights': model.weights,
+            'nprobe': KNN_IVF_NPROBE, 'n_points': int(len(X_fit)), 'build_seconds': build_seconds}
+    agreement = float(np.mean(index.predict(X_check, model.n_neighbors, model.weights, KNN_IVF_NPROBE) == model.predict(X_check)))
+    if method == 'ivf':
+        exact_path = os.path.join(MODELS_DIR, f'.{dirname}.exact')
+        build_index(exact_path, X_fit, y_fit, method='kd_tree', leaf_size=model.leaf_size)
+        try:
+            info['recall'] = recall_report(index, KNNIndex(exact_path), X_check, model.n_neighbors, KNN_IVF_NPROBE,
+                                           model.weights, self_ids)
+        finally:
+            shutil.rmtree(exact_path, ignore_errors=True)
+    elif agreement < 1.0:
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+    info['agreement'] = agreement
+    return info
+
+def remove_old_files(prefix, keep=None):
+    """
+    Supprime de MODELS_DIR les fichiers versionnés <prefix><version>[.joblib] (estimateurs à part, index
+    de voisins) qui ne sont plus référencés par l'artefact publié. Le précédent est conservé.
+    """
+    version = lambda name: int(name[len(prefix):].split('.')[0])
+    old = sorted((name for name in os.listdir(MODELS_DIR) if name.startswith(prefix) and name != keep), key=version)
+    # Le précédent reste disponible pour un worker qui sert encore l'ancien artefact
+    for name in old[:-1]:
+        path = os.path.join(MODELS_DIR, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.unlink(path)
+
+def artifact_knn_index(artifact):
+    """Index de voisins de l'artefact (ouvert en mmap au premier appel puis conservé), ou None."""
+    info = artifact.get('knn_index')
+    if not info:
+        return None
+    index = artifact.get('knn_searcher')
+    if index is None:
+        index = artifact['knn_searcher'] = KNNIndex(os.path.join(MODELS_DIR, info['dir']))
+    return index
+
+def predict_with_artifact(artifact, X_scaled):
+    """
+    Prédit avec l'index de voisins (KNN) ou le moteur compilé de l'artefact s'il existe,
+    sinon avec l'estimateur scikit-learn.
+    """
+    index = artifact_knn_index(artifact)
+    if index is not None:
+        info = artifact['knn_index']
+        return index.predict(X_scaled, info['n_neighbors'], info['weights'], info['nprobe'])
+    compiled = artifact.get('compiled')
+    if compiled is not None:
+        return predict_compiled(compiled, X_scaled)
+    return artifact['model'].predict(X_scaled)
+
+def fit_and_save(model_name, X_train, y_train, X_test, y_test):
+    """Entraîne, évalue et sauvegarde un modèle; retourne ses métriques et sa durée d'entraînement."""
+    model = build_estimator(model_name)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    metrics = evaluate_model(model, X_test, y_test)
+    compiled = export_compiled(model, X_test)
+    artifact = save_model(model_name, model, metrics, fit_seconds=fit_seconds, knn_queries=X_test, **compiled)
+    return {
+        'metrics': metrics,
+        'fit_seconds': fit_seconds,
+        'version': artifact['version'],
+        'compiled': artifact['compiled'] is not None,
+        'compiled_agreement': artifact['compiled_agreement'],
+        'knn_index': artifact.get('knn_index')
+    }
+
+def run_training(model_name, report):
+    """
+    Entraîne, évalue et sauvegarde un modèle. Exécutée dans un processus de tâche (voir training_jobs).
+
+    Args:
+        model_name (str): Clé du modèle dans MODELS
+        report (callable): report(progression entre 0 et 1, étape) pour suivre l'avancement
+    """
+    report(0.05, "Chargement des données")
+    refresh_data_if_changed()
+    report(0.1, "Entraînement")
+    outcome = fit_and_save(model_name, X_train, y_train, X_test, y_test)
+
+    return {
+        "message": f"Modèle '{model_name}' entraîné et sauvegardé avec succès.",
+        "metrics": outcome['metrics'],
+        "fit_seconds": outcome['fit_seconds'],
+        "version": outcome['version'],
+        "compiled": outcome['compiled'],
+        "compiled_agreement": outcome['compiled_agreement'],
+        "knn_index": outcome['knn_index']
+    }
+
+def run_cross_validation(model_name, k, report):
+    """
+    Validation croisée stratifiée en k plis (plis ajustés en parallèle), puis ajustement final sur
+    toutes les données, publié comme modèle servi. Exécutée dans un processus de tâche.
+    """
+    report(0.05, "Chargement des données")
+    refresh_data_if_changed()
+    report(0.1, f"Validation croisée en {k} plis et ajustement final")
+    model, model_scaler, cv_report = cross_validate(MODELS[model_name], X_clean, y_clean, k=k)
+
+    report(0.9, "Sauvegarde")
+    X_check = scale_matrix(X_clean[:1000], *scaler_params(model_scaler))
+    compiled = export_compiled(model, X_check)
+    metrics = {**cv_report['mean'], 'confusion_matrix': cv_report['confusion_matrix']}
+    artifact = save_model(model_name, model, metrics, model_scaler=model_scaler,
+                          fit_seconds=cv_report['final_fit_seconds'], cross_validation=cv_report, **compiled)
+
+    return {
+        "message": f"Modèle '{model_name}' évalué en validation croisée ({k} plis) et sauvegardé avec succès.",
+        "metrics": metrics,
+        "cross_validation": cv_report,
+        "fit_seconds": cv_report['final_fit_seconds'],
+        "version": artifact['version'],
+        "compiled": artifact['compiled'] is not None,
+        "compiled_agreement": artifact['compiled_agreement'],
+        "knn_index": artifact.get('knn_index')
+    }
+
+def run_streaming_training(model_name, epochs, report):
+    """
+    Entraîne un modèle incrémental en lisant DATA_PATH par blocs (voir streaming_training).
+    Exécutée dans un processus de tâche; les données n'ont pas besoin d'être chargées en mémoire.
+    """
+    fingerprint = data_fingerprint(CACHE_DIR, DATA_PATH)
+    outcome = train_streaming(build_estimator(model_name, STREAMING_MODELS), DATA_PATH, FEATURES, TARGET,
+                              chunk_rows=STREAM_TRAIN_CHUNK_ROWS, epochs=epochs, report=report)
+    report(0.95, "Sauvegarde")
+    compiled = export_compiled(outcome['model'], outcome['sample'])
+    artifact = save_model(model_name, outcome['model'], outcome['metrics'], model_scaler=outcome['scaler'],
+                          fingerprint=fingerprint, fit_seconds=outcome['fit_seconds'], training_mode='streaming', **compiled)
+
+    return {
+        "message": f"Modèle '{model_name}' entraîné en mode streaming et sauvegardé avec succès.",
+        "metrics": outcome['metrics'],
+        "fit_seconds": outcome['fit_seconds'],
+        "train_rows": outcome['train_rows'],
+        "holdout_rows": outcome['holdout_rows'],
+        "chunks": outcome['chunks'],
+        "epochs": outcome['epochs'],
+        "version": artifact['version'],
+        "compiled": artifact['compiled'] is not None,
+        "compiled_agreement": artifact['compiled_agreement']
+    }
+
+def run_training_all(model_names, report):
+    """
+    Entraîne plusieurs modèles en parallèle (un processus par modèle, données en mémoire partagée).
+
+    Args:
+        model_names (list): Clés des modèles dans MODELS
+        report (callable): report(progression entre 0 et 1, étape) pour suivre l'avancement
+    """
+    refresh_data_if_changed()
+    report(0.0, f"Entraînement parallèle de {len(model_names)} modèles")
+    arrays = {
+        'X_train': np.asarray(X_train), 'y_train': np.asarray(y_train),
+        'X_test': np.asarray(X_test), 'y_test': np.asarray(y_test)
+    }
+    results, errors, wall_seconds = run_parallel(fit_and_save, model_names, arrays, report=report)
+
+    models = {
+        name: {**outcome['result'], 'total_seconds': outcome['seconds']}
+        for name, outcome in results.items()
+    }
+    sequential_seconds = sum(m['total_seconds'] for m in models.values())
+    return {
+        "message": f"{len(models)} modèle(s) entraîné(s) et sauvegardé(s) en parallèle.",
+        "models": models,
+        "errors": errors,
+        "wall_seconds": wall_seconds,
+        "sequential_seconds": sequential_seconds,
+        "speedup": sequential_seconds / wall_seconds if wall_seconds else None
+    }
+
+@bp.route('/train', methods=['POST'])
 def train_model():
-    """Entraîne un modèle spécifié et le sauvegarde."""
-    if X_train is None:
-        return jsonify({"error": "Données non chargées. Redémarrez l'API."}), 500
-        
-    data = request.get_json()
+    """
+    Place l'entraînement d'un modèle dans la file des tâches et retourne immédiatement son identifiant.
+
+    Avec "mode": "streaming", le fichier de données est lu par blocs (modèles incrémentaux de
+    STREAMING_MODELS, "epochs" passages): il n'a pas besoin de tenir en mémoire.
+    Avec "cv": k, le modèle est évalué en validation croisée stratifiée en k plis au lieu d'une
+    seule séparation 80/20, puis réentraîné sur toutes les données.
+    """
+    data = request.get_json(silent=True) or {}
     model_name = data.get('model_name')
+    mode = data.get('mode', 'batch')
+    g.model_name = model_name
+
+    if mode == 'streaming':
+        if data.get('cv') is not None:
+            return jsonify({"error": "La validation croisée ('cv') n'est pas disponible en mode streaming."}), 400
+        return submit_streaming_training(model_name, data.get('epochs', STREAM_TRAIN_EPOCHS))
+    if mode != 'batch':
+        return jsonify({"error": f"Mode d'entraînement '{mode}' inconnu ('batch' ou 'streaming')."}), 400
+
+    unavailable = data_unavailable_response()
+    if unavailable:
+        return unavailable
     
     if model_name not in MODELS:
         return jsonify({"error": f"Modèle '{model_name}' non supporté."}), 400
-        
+
+    k = data.get('cv')
+    if k is not None:
+        # Chaque pli doit contenir au moins une ligne de chaque classe
+        max_k = min(20, int(np.unique(y_clean, return_counts=True)[1].min()))
+        if max_k < 2:
+            return jsonify({"error": "Validation croisée impossible sur ces données: une classe a moins de 2 lignes."}), 400
+        if isinstance(k, bool) or not isinstance(k, int) or not 2 <= k <= max_k:
+            return jsonify({"error": f"'cv' doit être un entier entre 2 et {max_k}."}), 400
+        try:
+            job = jobs.submit('train', run_cross_validation, (model_name, k), model_name=model_name, cv=k)
+        except JobQueueFull as e:
+            return jsonify({"error": str(e)}), 429
+        return jsonify({**job, "status_url": f"/jobs/{job['job_id']}"}), 202
+
     try:
-        model = MODELS[model_name]
-        model.fit(X_train, y_train)
-        
-        # Évaluation
-        y_pred = model.predict(X_test)
-        metrics = {
-            'accuracy': accuracy_score(y_test, y_pred),
-            'precision': precision_score(y_test, y_pred, average='weighted', zero_division=0),
-            'recall': recall_score(y_test, y_pred, average='weighted', zero_division=0),
-            'f1_score': f1_score(y_test, y_pred, average='weighted', zero_division=0),
-            'confusion_matrix': confusion_matrix(y_test, y_pred).tolist()
-        }
-        
-        # Sauvegarde du modèle
-        model_path = os.path.join(MODELS_DIR, f'{model_name}.pkl')
-        joblib.dump(model, model_path)
-        
-        return jsonify({
-            "message": f"Modèle '{model_name}' entraîné et sauvegardé avec succès.",
-            "metrics": metrics
-        })
-        
-    except Exception as e:
-        return jsonify({"error": f"Erreur lors de l'entraînement du modèle: {str(e)}"}), 500
+        job = jobs.submit('train', run_training, (model_name,), model_name=model_name)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({**job, "status_url": f"/jobs/{job['job_id']}"}), 202
+
+def submit_streaming_training(model_name, epochs):
+    """Place un entraînement en mode streaming dans la file des tâches."""
+    if model_name not in STREAMING_MODELS:
+        return jsonify({"error": f"Modèle '{model_name}' non supporté en mode streaming "
+                                 f"(modèles incrémentaux: {', '.join(STREAMING_MODELS)})."}), 400
+    if isinstance(epochs, bool) or not isinstance(epochs, int) or epochs < 1:
+        return jsonify({"error": "'epochs' doit être un entier positif."}), 400
+    if not os.path.exists(DATA_PATH):
+        return jsonify({"error": "Fichier de données non trouvé."}), 500
+
+    try:
+        job = jobs.submit('train', run_streaming_training, (model_name, epochs), model_name=model_name, mode='streaming')
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({**job, "status_url": f"/jobs/{job['job_id']}"}), 202
+
+@bp.route('/train/all', methods=['POST'])
+def train_all_models():
+    """Place l'entraînement parallèle de plusieurs modèles (tous par défaut) dans la file des tâches."""
+    unavailable = data_unavailable_response()
+    if unavailable:
+        return unavailable
+
+    data = request.get_json(silent=True) or {}
+    model_names = data.get('models') or list(MODELS.keys())
+    if not isinstance(model_names, list) or not all(isinstance(name, str) for name in model_names):
+        return jsonify({"error": "'models' doit être une liste de noms de modèles."}), 400
+    # Un modèle demandé deux fois n'est entraîné qu'une fois (ordre de la demande conservé)
+    model_names = list(dict.fromkeys(model_names))
+
+    unknown = [name for name in model_names if name not in MODELS]
+    if unknown:
+        return jsonify({"error": f"Modèle(s) non supporté(s): {', '.join(map(str, unknown))}."}), 400
+
+    try:
+        job = jobs.submit('train_all', run_training_all, (model_names,), models=model_names)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({**job, "status_url": f"/jobs/{job['job_id']}"}), 202
+
+# --- Recherche d'hyperparamètres (/tune) ---
 
-@app.route('/predict', methods=['POST'])
+def publish_tuned(model_name, estimator, search_report, key):
+    """Publie le meilleur estimateur d'une recherche comme modèle servi, avec le rapport de la recherche."""
+    compiled = export_compiled(estimator, X_test)
+    return save_model(model_name, estimator, search_report['test_metrics'], fit_seconds=search_report['refit_seconds'],
+                      knn_queries=X_test, tuning={**search_report, 'key': key}, **compiled)
+
+def run_tuning(model_name, param_grid, settings, report):
+    """
+    Recherche les meilleurs hyperparamètres d'un modèle et publie le meilleur estimateur.
+    Exécutée dans un processus de tâche; la recherche utilise tous les cœurs.
+    """
+    report(0.05, "Chargement des données")
+    refresh_data_if_changed()
+    key = tuning_key(model_name, param_grid, DATA_FINGERPRINT, settings)
+
+    cached = load_cached(CACHE_DIR, key)
+    if cached is not None:
+        search_report, estimator = cached['report'], cached['estimator']
+    else:
+        report(0.1, "Recherche par divisions successives")
+        estimator, search_report = run_search(build_estimator(model_name), param_grid, X_train, y_train, **settings)
+        report(0.9, "Évaluation du meilleur modèle")
+        search_report['test_metrics'] = evaluate_model(estimator, X_test, y_test)
+        save_cached(CACHE_DIR, key, search_report, estimator)
+
+    artifact = publish_tuned(model_name, estimator, search_report, key)
+    return {
+        "message": f"Meilleure configuration de '{model_name}' sauvegardée.",
+        "cached": cached is not None,
+        "version": artifact['version'],
+        "report": search_report
+    }
+
+@bp.route('/tune', methods=['POST'])
+def tune_model():
+    """
+    Recherche d'hyperparamètres par divisions successives (HalvingRandomSearchCV, tous les cœurs).
+
+    Corps: model_name, et facultativement param_grid ({paramètre: liste de valeurs}, TUNING_GRIDS par
+    défaut), scoring ('f1_weighted' par défaut) et cv (5 par défaut). Une recherche déjà faite sur les
+    mêmes données est servie depuis le cache (200, publication de son meilleur estimateur placée dans la
+    file si ce n'est pas encore le modèle servi: 'publish_job'); sinon elle est placée dans la file (202).
+    """
+    unavailable = data_unavailable_response()
+    if unavailable:
+        return unavailable
+
+    data = request.get_json(silent=True) or {}
+    model_name = data.get('model_name')
+    g.model_name = model_name
+    if model_name not in MODELS:
+        return jsonify({"error": f"Modèle '{model_name}' non supporté."}), 400
+
+    param_grid = data.get('param_grid') or TUNING_GRIDS[model_name]
+    cv = data.get('cv', 5)
+    scoring = data.get('scoring', 'f1_weighted')
+    from sklearn.metrics import get_scorer_names
+    try:
+        validate_grid(build_estimator(model_name), param_grid)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if isinstance(cv, bool) or not isinstance(cv, int) or not 2 <= cv <= 20:
+        return jsonify({"error": "'cv' doit être un entier entre 2 et 20."}), 400
+    if scoring not in get_scorer_names():
+        return jsonify({"error": f"Métrique '{scoring}' inconnue."}), 400
+    settings = {'scoring': scoring, 'cv': cv}
+
+    # Même recherche sur le fichier de données tel qu'il est maintenant: rapport immédiat. La clé est tirée
+    # de l'empreinte du fichier (et non des données en mémoire, que /ingest ne recharge pas dans ce processus):
+    # c'est celle qu'utilise la tâche, qui relit les données si le fichier a changé
+    try:
+        key = tuning_key(model_name, param_grid, data_fingerprint(CACHE_DIR, DATA_PATH), settings)
+        cached = load_cached(CACHE_DIR, key)
+    except OSError as e:
+        return jsonify({"error": f"Fichier de données illisible: {str(e)}"}), 500
+    try:
+        current = get_artifact(model_name) if cached is not None else None
+    except (FileNotFoundError, ValueError):
+        current = None
+
+    published = current is not None and (current.get('tuning') or {}).get('key') == key
+    if cached is not None and published:
+        return jsonify({"cached": True, "version": current['version'], "report": cached['report']})
+
+    # Recherche, ou publication d'un résultat déjà en cache (la tâche relit alors les données si besoin et
+    # publie avec le scaler et le jeu de test qui correspondent à la clé): jamais dans un worker qui sert l'API
+    try:
+        job = queue_tuning(model_name, param_grid, settings, key)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+
+    if cached is not None:
+        return jsonify({"cached": True, "version": None, "report": cached['report'],
+                        "publish_job": {**job, "status_url": f"/jobs/{job['job_id']}"}})
+    return jsonify({**job, "status_url": f"/jobs/{job['job_id']}"}), 202
+
+def queue_tuning(model_name, param_grid, settings, key):
+    """Place une recherche dans la file, sauf si la même (même clé) y attend ou s'exécute déjà."""
+    for job in jobs.list():
+        if job['status'] in ('queued', 'running') and job['kind'] == 'tune' and job.get('tuning_key') == key:
+            return job
+    return jobs.submit('tune', run_tuning, (model_name, param_grid, settings), model_name=model_name, tuning_key=key)
+
+# --- Ajout incrémental de données (/ingest) ---
+
+# État de /ingest partagé par les workers gunicorn, modifié sous INGEST_LOCK_PATH: compteurs d'ajouts et
+# modèles marqués périmés (nom -> horodatage (µs) du dernier ajout qu'ils n'ont pas appris).
+# Un modèle n'est plus périmé dès que son artefact a une version plus récente (réentraînement terminé).
+INGEST_STATE_PATH = os.path.join(CACHE_DIR, 'ingest_state.json')
+INGEST_LOCK_PATH = os.path.join(CACHE_DIR, 'ingest.lock')
+_ingest_lock = threading.Lock()
+
+def read_ingest_state():
+    """État de /ingest enregistré (vide si aucun ajout n'a encore eu lieu)"""
+    try:
+        with open(INGEST_STATE_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'requests': 0, 'rows': 0, 'last_ingest': None, 'stale_models': {}}
+
+def supports_partial_fit(artifact):
+    """Vrai si l'estimateur de l'artefact est incrémental, d'après son mode d'entraînement (estimateur non chargé)."""
+    catalog = STREAMING_MODELS if artifact.get('training_mode') == 'streaming' else MODELS
+    spec = catalog.get(artifact.get('model_name'))
+    # Les estimateurs de STREAMING_MODELS ont tous partial_fit
+    return spec is not None and spec[:2] in {streaming[:2] for streaming in STREAMING_MODELS.values()}
+
+def update_incrementally(model_name, X_new, y_new):
+    """
+    Met à jour un modèle entraîné avec de nouvelles lignes (partial_fit), sans relire l'historique.
+
+    Le scaler de l'artefact reste figé: les paramètres du modèle ont été appris dans son espace mis à
+    l'échelle, et le déplacer à chaque ajout décalerait ce repère sous le modèle. Les nouvelles lignes sont
+    mises à l'échelle avec lui; seul un réentraînement complet recalcule le scaler. Le modèle publié est
+    une copie: l'artefact servi par le registre n'est jamais modifié. Retourne None si le modèle ne peut
+    pas être mis à jour (pas de partial_fit, ou classe jamais vue).
+
+    Les modèles sans partial_fit sont écartés d'après les métadonnées de l'artefact, sans charger leur
+    estimateur: seuls les estimateurs effectivement mis à jour sont lus.
+    """
+    artifact = get_artifact(model_name)
+    if not supports_partial_fit(artifact):
+        return None
+    start = time.perf_counter()
+    model = model_copy(artifact)
+    if not hasattr(model, 'partial_fit') or not set(np.unique(y_new).tolist()) <= set(model.classes_.tolist()):
+        return None
+
+    X_scaled = scale_matrix(X_new, *artifact_scaling(artifact))
+    model.partial_fit(X_scaled, y_new)
+
+    ingested_rows = artifact.get('ingested_rows', 0) + len(y_new)
+    compiled = export_compiled(model, X_scaled)
+    # Métriques et empreinte de l'entraînement complet conservées; ingested_rows compte les lignes apprises depuis
+    updated = save_model(model_name, model, artifact['metrics'], model_scaler=artifact['scaler'],
+                         fingerprint=artifact['data_fingerprint'], fit_seconds=artifact.get('fit_seconds'),
+                         training_mode=artifact.get('training_mode', 'batch'), ingested_rows=ingested_rows, **compiled)
+    return {'version': updated['version'], 'seconds': time.perf_counter() - start, 'ingested_rows': ingested_rows}
+
+def queue_retrain(model_name):
+    """
+    Place un réentraînement complet dans la file, sauf si un réentraînement de ce modèle y attend déjà
+    (il lira les données à son démarrage, nouvelles lignes comprises). Retourne l'identifiant de la tâche.
+    """
+    for job in jobs.list():
+        if job['status'] == 'queued' and job['kind'] == 'train' and job.get('model_name') == model_name \
+                and job.get('mode') != 'streaming':
+            return job['job_id']
+    return jobs.submit('train', run_training, (model_name,), model_name=model_name, reason='ingest')['job_id']
+
+def stale_models(state=None):
+    """
+    Modèles marqués périmés dont le réentraînement n'a pas encore publié de nouvelle version.
+
+    Les versions publiées sont lues dans le manifeste des modèles: aucun artefact n'est chargé.
+    """
+    manifest = read_manifest(MODELS_DIR)
+    if manifest is None:
+        models_manifest.get()  # crée le manifeste (modèles entraînés avant son introduction)
+        manifest = read_manifest(MODELS_DIR) or {'models': {}}
+    stale = {}
+    for model_name, marker in (state or read_ingest_state())['stale_models'].items():
+        entry = manifest['models'].get(model_name)
+        if entry is None:
+            continue
+        if (entry.get('version') or 0) < marker:
+            stale[model_name] = marker
+    return stale
+
+@bp.route('/ingest', methods=['POST'])
+def ingest():
+    """
+    Ajoute des lectures étiquetées au fichier de données et met à jour les modèles.
+
+    Corps: 'rows' ou 'columns' (comme /predict/batch) et 'labels' (une classe de QUALITY_MAP par ligne).
+    Les modèles incrémentaux (partial_fit) apprennent immédiatement les nouvelles lignes; les autres
+    sont marqués périmés et un réentraînement complet est placé dans la file des tâches.
+    """
+    data = request.get_json(silent=True) or {}
+    X_new, error = parse_batch_features(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    labels = data.get('labels')
+    if not isinstance(labels, list) or len(labels) != len(X_new):
+        return jsonify({"error": f"'labels' doit être une liste de {len(X_new)} classes (une par ligne)."}), 400
+    if any(isinstance(label, bool) or label not in QUALITY_MAP for label in labels):
+        return jsonify({"error": f"Classes valides: {sorted(QUALITY_MAP)}."}), 400
+    y_new = np.asarray(labels, dtype=np.int64)
+
+    if not os.path.exists(DATA_PATH):
+        return jsonify({"error": "Fichier de données non trouvé."}), 500
+
+    trained = sorted(f[:-len('.pkl')] for f in os.listdir(MODELS_DIR) if f.endswith('.pkl') and f[:-len('.pkl')] in MODELS)
+    updated, errors, stale = {}, {}, []
+    # Un seul ajout à la fois, y compris entre workers gunicorn (ajout au CSV, publication des artefacts
+    # et état partagé de /ingest)
+    with _ingest_lock, file_lock(INGEST_LOCK_PATH):
+        try:
+            append_rows(DATA_PATH, FEATURES, TARGET, X_new, y_new)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 500
+        marker = time.time_ns() // 1000
+
+        for model_name in trained:
+            try:
+                outcome = update_incrementally(model_name, X_new, y_new)
+            except Exception as e:
+                errors[model_name] = str(e)
+                outcome = None
+            if outcome is None:
+                stale.append(model_name)
+            else:
+                updated[model_name] = outcome
+
+        state = read_ingest_state()
+        # Les marqueurs des modèles réentraînés depuis sont retirés
+        state['stale_models'] = {**stale_models(state), **{model_name: marker for model_name in stale}}
+        state['requests'] += 1
+        state['rows'] += len(y_new)
+        state['last_ingest'] = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        # Écrit à part puis renommé: un worker qui le lit voit toujours un fichier complet
+        atomic_write_json(state, INGEST_STATE_PATH)
+
+        # Sous le verrou: deux workers ne placent pas chacun le même réentraînement dans la file
+        retrain_jobs = {}
+        for model_name in stale:
+            try:
+                retrain_jobs[model_name] = queue_retrain(model_name)
+            except JobQueueFull as e:
+                errors[model_name] = str(e)
+
+    return jsonify({
+        "rows_ingested": len(y_new),
+        "updated_models": updated,
+        "stale_models": stale,
+        "retrain_jobs": retrain_jobs,
+        "errors": errors
+    })
+
+@bp.route('/ingest', methods=['GET'])
+def ingest_status():
+    """Lignes ajoutées (par tous les workers) et modèles en attente de réentraînement."""
+    state = read_ingest_state()
+    return jsonify({**state, "stale_models": sorted(stale_models(state))})
+
+@bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Liste les tâches d'entraînement connues et les limites de la file."""
+    return jsonify({"jobs": jobs.list(), **jobs.stats()})
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Statut, progression, métriques ou erreur d'une tâche d'entraînement."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Tâche '{job_id}' introuvable."}), 404
+    return jsonify(job)
+
+@bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Annule une tâche en attente ou en cours d'exécution."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Tâche '{job_id}' introuvable."}), 404
+    return jsonify(job)
+
+def get_artifact(model_name):
+    """
+    Retourne l'artefact d'inférence d'un modèle depuis le registre.
+
+    Les modèles sauvegardés avant l'introduction des artefacts (estimateur seul) sont servis
+    avec le scaler courant, ce qui suppose que les données d'entraînement sont chargées.
+    """
+    loaded = registry.get(model_name)
+    if is_artifact(loaded):
+        return loaded
+    if scaler is None:
+        raise ValueError(f"Le modèle '{model_name}' est dans un ancien format sans scaler. Veuillez le réentraîner.")
+    return build_artifact(model_name, loaded, scaler, FEATURES, QUALITY_MAP, None, None, version=None)
+
+micro_batcher = MicroBatcher(predict_with_artifact, MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_ROWS) if MICRO_BATCH_ENABLED else None
+
+@bp.route('/predict/microbatch', methods=['GET'])
+def micro_batch_stats():
+    """Statistiques du micro-batching de /predict (taille des lots, attente en file)."""
+    if micro_batcher is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **micro_batcher.stats()})
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL,
+                                   parse_precision(PREDICTION_CACHE_DECIMALS, FEATURES)) if PREDICTION_CACHE_ENABLED else None
+
+@bp.route('/predict/cache', methods=['GET', 'DELETE'])
+def prediction_cache_stats():
+    """Statistiques du cache des prédictions (taux de succès, mémoire); DELETE le vide."""
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    if request.method == 'DELETE':
+        prediction_cache.invalidate()
+    return jsonify({"enabled": True, **prediction_cache.stats()})
+
+def artifact_scaling(artifact):
+    """Moyenne et échelle du scaler de l'artefact (calculées au premier appel puis conservées)."""
+    scaling = artifact.get('scaling')
+    if scaling is None:
+        scaling = artifact['scaling'] = scaler_params(artifact['scaler'])
+    return scaling
+
+@bp.route('/predict', methods=['POST'])
 def predict():
     """Effectue une prédiction avec un modèle sauvegardé."""
-    data = request.get_json()
+    start = time.perf_counter()
+    data = request.get_json(silent=True) or {}
     model_name = data.get('model_name')
     features_data = data.get('features') # Doit être une liste de valeurs
+    g.model_name = model_name
     
     if not model_name or not features_data:
         return jsonify({"error": "Nom du modèle et données de caractéristiques (features) requis."}), 400
@@ -140,38 +1180,264 @@ def predict():
     if not os.path.exists(model_path):
         return jsonify({"error": f"Modèle '{model_name}' non trouvé. Veuillez l'entraîner d'abord."}), 404
         
+    # Valider les valeurs: features_data doit être une liste de 9 nombres dans l'ordre de FEATURES
     try:
-        # Charger le modèle
-        model = joblib.load(model_path)
+        values = parse_features(features_data, len(FEATURES))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
         
-        # Préparer les données pour la prédiction
-        # features_data doit être une liste de 9 valeurs correspondant à FEATURES
-        if len(features_data) != len(FEATURES):
-            return jsonify({"error": f"Nombre incorrect de caractéristiques. Attendu: {len(FEATURES)}, Reçu: {len(features_data)}."}), 400
-            
-        input_df = pd.DataFrame([features_data], columns=FEATURES)
+    try:
+        parsed = time.perf_counter()
+
+        # Récupérer l'artefact depuis le registre (désérialisé une seule fois par processus)
+        artifact = get_artifact(model_name)
+        features = artifact['features']
+        mean, scale = artifact_scaling(artifact)
+        loaded = time.perf_counter()
+
+        # Cache des prédictions: les valeurs sont arrondies à la précision configurée, et la
+        # prédiction est faite sur ces valeurs arrondies pour qu'une clé donne toujours le même résultat
+        prediction = None
+        if prediction_cache is not None:
+            values = prediction_cache.quantize(values)
+            prediction = prediction_cache.get(model_name, artifact['version'], values)
         
-        # Mise à l'échelle des données d'entrée
-        scaled_input = scaler.transform(input_df)
+        # Mise à l'échelle avec les statistiques du scaler de l'artefact, sans DataFrame ni scaler.transform
+        if prediction is None:
+            scaled_input = scale_row(values, mean, scale)
+        transformed = time.perf_counter()
         
-        # Prédiction
-        prediction = model.predict(scaled_input)[0]
+        # Prédiction (regroupée avec les requêtes concurrentes si le micro-batching est activé)
+        if prediction is None:
+            if micro_batcher is not None:
+                prediction = micro_batcher.predict(model_name, artifact, scaled_input)
+            else:
+                prediction = predict_with_artifact(artifact, scaled_input)[0]
+            if prediction_cache is not None:
+                prediction_cache.put(model_name, artifact['version'], values, prediction)
+        predicted = time.perf_counter()
         
         # Mapping de la prédiction
-        quality_map = {0: 'Bonne', 1: 'Modérée', 2: 'Mauvaise', 3: 'Dangereuse'}
-        predicted_label = quality_map.get(prediction, "Inconnu")
+        predicted_label = artifact['label_map'].get(prediction, "Inconnu")
         
-        return jsonify({
+        response = jsonify({
             "model_name": model_name,
+            "model_version": artifact['version'],
             "prediction_code": int(prediction),
             "prediction_label": predicted_label,
-            "features_used": FEATURES
+            "features_used": features
         })
+        serialized = time.perf_counter()
+
+        label = _model_label(model_name)
+        for phase, duration in (('parse', parsed - start), ('model_load', loaded - parsed),
+                                ('transform', transformed - loaded), ('predict', predicted - transformed),
+                                ('serialize', serialized - predicted)):
+            PREDICT_PHASE_LATENCY.observe(duration, label, phase)
+        return response
         
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la prédiction: {str(e)}"}), 500
 
+def parse_batch_features(data):
+    """
+    Convertit le corps d'une requête batch en matrice (n_lignes, len(FEATURES)).
+
+    Deux formats sont acceptés:
+      - 'rows': liste de lignes, chacune étant une liste de len(FEATURES) valeurs
+      - 'columns': dictionnaire {caractéristique: liste de valeurs} couvrant toutes les FEATURES
+
+    Retourne (matrice, None) ou (None, message d'erreur).
+    """
+    rows = data.get('rows')
+    columns = data.get('columns')
+
+    if (rows is None) == (columns is None):
+        return None, "Fournir exactement un des champs 'rows' (liste de lignes) ou 'columns' (valeurs par caractéristique)."
+
+    if rows is not None:
+        if not isinstance(rows, list) or not rows:
+            return None, "'rows' doit être une liste non vide de lignes."
+        for i, row in enumerate(rows):
+            if not isinstance(row, list) or len(row) != len(FEATURES):
+                return None, f"Ligne {i}: {len(FEATURES)} valeurs attendues dans l'ordre {FEATURES}."
+        n_rows = len(rows)
+    else:
+        if not isinstance(columns, dict):
+            return None, "'columns' doit être un dictionnaire {caractéristique: liste de valeurs}."
+        missing = [f for f in FEATURES if f not in columns]
+        if missing:
+            return None, f"Colonnes manquantes: {', '.join(missing)}."
+        lengths = {len(columns[f]) if isinstance(columns[f], list) else -1 for f in FEATURES}
+        if len(lengths) != 1 or -1 in lengths:
+            return None, "Toutes les colonnes doivent être des listes de même longueur."
+        n_rows = lengths.pop()
+        if n_rows == 0:
+            return None, "Les colonnes sont vides."
+
+    if n_rows > MAX_BATCH_SIZE:
+        return None, f"Lot trop grand: {n_rows} lignes (maximum {MAX_BATCH_SIZE})."
+
+    # Comme parse_features (/predict): un booléen n'est pas une valeur numérique, même si NumPy le convertit
+    values = rows if rows is not None else [columns[f] for f in FEATURES]
+    if any(isinstance(value, bool) for line in values for value in line):
+        return None, "Toutes les valeurs des caractéristiques doivent être numériques."
+
+    try:
+        if rows is not None:
+            matrix = np.array(rows, dtype=np.float64)
+        else:
+            matrix = np.column_stack([np.asarray(columns[f], dtype=np.float64) for f in FEATURES])
+    except (TypeError, ValueError):
+        return None, "Toutes les valeurs des caractéristiques doivent être numériques."
+
+    invalid = ~np.isfinite(matrix).all(axis=1)
+    if invalid.any():
+        bad_rows = np.flatnonzero(invalid)[:10].tolist()
+        return None, f"Valeurs manquantes ou non finies aux lignes: {bad_rows}."
+
+    return matrix, None
+
+@bp.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Effectue des prédictions vectorisées sur un lot de lignes avec un modèle sauvegardé."""
+    data = request.get_json(silent=True) or {}
+    model_name = data.get('model_name')
+    g.model_name = model_name
+
+    if not model_name:
+        return jsonify({"error": "Nom du modèle (model_name) requis."}), 400
+
+    model_path = os.path.join(MODELS_DIR, f'{model_name}.pkl')
+    if not os.path.exists(model_path):
+        return jsonify({"error": f"Modèle '{model_name}' non trouvé. Veuillez l'entraîner d'abord."}), 404
+
+    matrix, error = parse_batch_features(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        artifact = get_artifact(model_name)
+
+        # Une seule mise à l'échelle et une seule prédiction pour tout le lot
+        scaled_input = scale_matrix(matrix, *artifact_scaling(artifact))
+        predictions = predict_with_artifact(artifact, scaled_input)
+
+        codes = [int(p) for p in predictions]
+        return jsonify({
+            "model_name": model_name,
+            "model_version": artifact['version'],
+            "count": len(codes),
+            "prediction_codes": codes,
+            "prediction_labels": [artifact['label_map'].get(c, "Inconnu") for c in codes],
+            "features_used": artifact['features']
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la prédiction: {str(e)}"}), 500
+
+def _format_stream_chunk(predictions, valid, start_row, output_format, label_map):
+    """Sérialise les prédictions d'un bloc en NDJSON ou en CSV."""
+    lines = []
+    pred_iter = iter(predictions)
+    for offset, is_valid in enumerate(valid):
+        row = start_row + offset
+        if is_valid:
+            code = int(next(pred_iter))
+            label = label_map.get(code, "Inconnu")
+        else:
+            code, label = None, None
+        if output_format == 'csv':
+            lines.append(f"{row},{'' if code is None else code},{label or ''}\n")
+        else:
+            record = {"row": row, "prediction_code": code, "prediction_label": label}
+            if code is None:
+                record["error"] = "Valeurs manquantes ou non numériques."
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+    return "".join(lines)
+
+@bp.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """
+    Évalue un fichier CSV (mêmes colonnes que pollution.csv) envoyé comme corps brut de la requête.
+
+    Le corps est lu par blocs de STREAM_CHUNK_ROWS lignes; chaque bloc est mis à l'échelle, prédit
+    puis renvoyé immédiatement (NDJSON par défaut, CSV avec ?format=csv). La mémoire du serveur
+    reste donc constante quelle que soit la taille du fichier.
+    """
+    model_name = request.args.get('model_name')
+    g.model_name = model_name
+    output_format = request.args.get('format', 'ndjson')
+
+    if not model_name:
+        return jsonify({"error": "Paramètre 'model_name' requis."}), 400
+    if output_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "Format de sortie non supporté. Choisir 'ndjson' ou 'csv'."}), 400
+
+    model_path = os.path.join(MODELS_DIR, f'{model_name}.pkl')
+    if not os.path.exists(model_path):
+        return jsonify({"error": f"Modèle '{model_name}' non trouvé. Veuillez l'entraîner d'abord."}), 404
+
+    import pandas as pd
+    try:
+        artifact = get_artifact(model_name)
+        reader = pd.read_csv(request.stream, chunksize=STREAM_CHUNK_ROWS)
+        # Lire le premier bloc avant de commencer la réponse pour pouvoir encore renvoyer une erreur 400
+        first_chunk = next(reader, None)
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la lecture du fichier CSV: {str(e)}"}), 400
+
+    if first_chunk is None:
+        return jsonify({"error": "Le fichier CSV est vide."}), 400
+    features = artifact['features']
+    missing_cols = [col for col in features if col not in first_chunk.columns]
+    if missing_cols:
+        return jsonify({"error": f"Colonnes manquantes: {', '.join(missing_cols)}."}), 400
+
+    def generate():
+        if output_format == 'csv':
+            yield "row,prediction_code,prediction_label\n"
+        start_row = 0
+        chunk = first_chunk
+        while chunk is not None:
+            values = chunk[features].apply(pd.to_numeric, errors='coerce')
+            valid = np.isfinite(values.to_numpy(dtype=np.float64)).all(axis=1)
+            predictions = []
+            if valid.any():
+                predictions = predict_with_artifact(artifact, scale_matrix(values[valid].to_numpy(dtype=np.float64), *artifact_scaling(artifact)))
+            yield _format_stream_chunk(predictions, valid, start_row, output_format, artifact['label_map'])
+            start_row += len(chunk)
+            chunk = next(reader, None)
+
+    mimetype = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+STARTUP_TIMINGS['imports'] = time.perf_counter() - _IMPORT_START
+
+def create_app(load_data=True, background=True):
+    """
+    Fabrique de l'application Flask.
+
+    Args:
+        load_data (bool): Charger les données d'entraînement au démarrage
+        background (bool): Charger les données (et préchauffer les modèles, WARMUP_ENABLED=1) dans des threads
+            d'arrière-plan; l'API répond immédiatement, /health et /ready indiquent quand elle est prête
+    """
+    start = time.perf_counter()
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    STARTUP_TIMINGS['create_app'] = time.perf_counter() - start
+
+    if load_data:
+        start_data_loading(background=background)
+    start_warm_up(background=background)
+    return app
+
 if __name__ == '__main__':
     # Pour le déploiement, il est préférable d'utiliser un serveur WSGI comme Gunicorn
     # Pour ce projet, nous utilisons le serveur de développement Flask
+    app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import requests
 import json
+import time
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
@@ -24,13 +25,22 @@ FEATURES = ['Temperature', 'Humidity', 'PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'Pro
 
 # --- Fonctions d'Interaction avec l'API ---
 
-@st.cache_data(ttl=60)
+@st.cache_resource
+def _models_cache():
+    """Dernière réponse de /models et son ETag (conservés entre les réexécutions du script)"""
+    return {'etag': None, 'body': None}
+
 def get_models():
-    """Récupère la liste des modèles disponibles depuis l'API."""
+    """Récupère la liste des modèles disponibles depuis l'API (revalidée par ETag: 304 tant que rien n'a changé)."""
+    cache = _models_cache()
     try:
-        response = requests.get(f"{API_URL}/models")
+        headers = {'If-None-Match': cache['etag']} if cache['etag'] else {}
+        response = requests.get(f"{API_URL}/models", headers=headers)
+        if response.status_code == 304:
+            return cache['body']
         response.raise_for_status()
-        return response.json()
+        cache.update(etag=response.headers.get('ETag'), body=response.json())
+        return cache['body']
     except requests.exceptions.ConnectionError:
         st.error(f"Erreur de connexion à l'API Flask. Assurez-vous que le backend est lancé à {API_URL}.")
         return None
@@ -38,16 +48,50 @@ def get_models():
         st.error(f"Erreur lors de la récupération des modèles: {e}")
         return None
 
+def wait_for_job(job_id, poll_interval=0.5, on_progress=None):
+    """Attend la fin d'une tâche d'entraînement de l'API et retourne sa description finale."""
+    while True:
+        response = requests.get(f"{API_URL}/jobs/{job_id}")
+        response.raise_for_status()
+        job = response.json()
+        if on_progress is not None:
+            on_progress(job)
+        if job['status'] in ('succeeded', 'failed', 'cancelled'):
+            return job
+        time.sleep(poll_interval)
+
 def train_model(model_name):
-    """Lance l'entraînement d'un modèle via l'API."""
+    """Lance l'entraînement d'un modèle via l'API et attend la fin de la tâche."""
     try:
         response = requests.post(f"{API_URL}/train", json={'model_name': model_name})
         response.raise_for_status()
-        return response.json()
+        job = wait_for_job(response.json()['job_id'])
+        if job['status'] != 'succeeded':
+            st.error(f"Échec de l'entraînement du modèle {model_name}: {job.get('error') or job['status']}")
+            return None
+        return job['result']
     except requests.exceptions.RequestException as e:
         st.error(f"Erreur lors de l'entraînement du modèle {model_name}: {e}")
         return None
 
+def train_all_models(model_names, progress_bar=None):
+    """Lance l'entraînement parallèle de plusieurs modèles via l'API et attend la fin de la tâche."""
+    def on_progress(job):
+        if progress_bar is not None:
+            progress_bar.progress(min(1.0, job['progress']), text=job['stage'])
+
+    try:
+        response = requests.post(f"{API_URL}/train/all", json={'models': model_names})
+        response.raise_for_status()
+        job = wait_for_job(response.json()['job_id'], on_progress=on_progress)
+        if job['status'] != 'succeeded':
+            st.error(f"Échec de l'entraînement des modèles: {job.get('error') or job['status']}")
+            return None
+        return job['result']
+    except requests.exceptions.RequestException as e:
+        st.error(f"Erreur lors de l'entraînement des modèles: {e}")
+        return None
+
 def predict_data(model_name, features):
     """Effectue une prédiction via l'API."""
     try:
@@ -58,6 +102,22 @@ def predict_data(model_name, features):
         st.error(f"Erreur lors de la prédiction avec {model_name}: {e}")
         return None
 
+def predict_csv(model_name, csv_bytes):
+    """Évalue toutes les lignes d'un fichier CSV via l'endpoint de streaming de l'API."""
+    try:
+        response = requests.post(
+            f"{API_URL}/predict/stream",
+            params={'model_name': model_name, 'format': 'ndjson'},
+            data=csv_bytes,
+            headers={'Content-Type': 'text/csv'},
+            stream=True
+        )
+        response.raise_for_status()
+        return [json.loads(line) for line in response.iter_lines() if line]
+    except requests.exceptions.RequestException as e:
+        st.error(f"Erreur lors de la prédiction du fichier avec {model_name}: {e}")
+        return None
+
 # --- Pages Streamlit ---
 
 def home_page():
@@ -122,17 +182,19 @@ def training_page():
         results = []
         progress_bar = st.progress(0)
         
-        for i, model_name in enumerate(selected_models):
-            st.write(f"Entraînement de **{model_name}**...")
-            result = train_model(model_name)
-            
-            if result and 'metrics' in result:
-                metrics = result['metrics']
-                metrics['Model'] = model_name
-                results.append(metrics)
-                st.success(f"✅ {model_name} entraîné avec succès. Accuracy: {metrics['accuracy']:.4f}")
-            
-            progress_bar.progress((i + 1) / len(selected_models))
+        # Tous les modèles sont entraînés en parallèle par l'API (une seule tâche)
+        training = train_all_models(selected_models, progress_bar)
+        
+        if training:
+            for model_name in selected_models:
+                if model_name in training['models']:
+                    metrics = training['models'][model_name]['metrics']
+                    metrics['Model'] = model_name
+                    results.append(metrics)
+                    st.success(f"✅ {model_name} entraîné avec succès en {training['models'][model_name]['fit_seconds']:.2f} s. Accuracy: {metrics['accuracy']:.4f}")
+                elif model_name in training['errors']:
+                    st.error(f"❌ {model_name}: {training['errors'][model_name]}")
+            st.info(f"Durée totale: {training['wall_seconds']:.2f} s (séquentiel estimé: {training['sequential_seconds']:.2f} s)")
             
         st.markdown("---")
         st.subheader("2. Résultats Comparatifs")
@@ -234,6 +296,14 @@ def prediction_page():
                 features_input = df_upload[FEATURES].iloc[0].tolist()
                 st.info("La prédiction sera effectuée sur la première ligne du fichier.")
                 
+                if st.button(f"📄 Prédire toutes les lignes du fichier avec {selected_model}"):
+                    with st.spinner(f"Prédiction du fichier en cours avec {selected_model}..."):
+                        results = predict_csv(selected_model, uploaded_file.getvalue())
+                    if results is not None:
+                        df_results = pd.DataFrame(results).set_index('row')
+                        st.dataframe(df_results)
+                        st.bar_chart(df_results['prediction_label'].value_counts())
+                
             except Exception as e:
                 st.error(f"Erreur lors de la lecture du fichier CSV: {e}")
                 return
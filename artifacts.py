@@ -0,0 +1,196 @@
+"""
+Artefacts d'inférence versionnés.
+
+Un artefact regroupe dans un seul fichier .pkl tout ce qu'il faut pour servir
+un modèle sans recharger le jeu de données: l'estimateur entraîné, le scaler
+ajusté sur les mêmes données, l'ordre des caractéristiques, la table des
+étiquettes, les métriques d'entraînement et l'empreinte des données.
+
+Quand l'artefact peut être servi sans l'estimateur scikit-learn (moteur
+compilé ou index de voisins), l'estimateur est écrit à part dans un fichier
+<nom>.estimator-<version>.joblib, chargé seulement au premier accès à
+artifact['model']. Le fichier principal ne contient alors que des tableaux
+NumPy non compressés, que load_artifact projette en mémoire en lecture seule
+(mmap_mode='r'): tous les workers d'une machine partagent les mêmes pages du
+cache disque au lieu d'en garder chacun une copie privée. (Les arbres de
+scikit-learn recopient leurs nœuds au chargement: projeter l'estimateur
+lui-même ne partagerait rien.)
+
+Le module fournit aussi les écritures atomiques et le verrou de fichier
+(fcntl.flock) des autres fichiers partagés par les workers: manifeste des
+modèles, état des tâches, cache des données.
+"""
+
+import copy
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import joblib
+
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def build_artifact(model_name, model, scaler, features, label_map, metrics, data_fingerprint, **extra):
+    """
+    Construit un artefact d'inférence (dictionnaire sérialisable par joblib)
+
+    Args:
+        model_name (str): Nom du modèle (clé de MODELS)
+        model: Estimateur scikit-learn entraîné
+        scaler: StandardScaler ajusté sur les données d'entraînement du modèle
+        features (list): Ordre des caractéristiques attendu par le scaler et le modèle
+        label_map (dict): Code de classe -> libellé
+        metrics (dict): Métriques d'évaluation calculées à l'entraînement
+        data_fingerprint (str): Empreinte SHA-256 du fichier de données d'entraînement
+        **extra: Métadonnées supplémentaires (durée d'entraînement, mode, ...)
+    """
+    return {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_name': model_name,
+        # Horodatage en microsecondes: croissant d'un entraînement à l'autre
+        'version': time.time_ns() // 1000,
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'model': model,
+        'scaler': scaler,
+        'features': list(features),
+        'label_map': dict(label_map),
+        'metrics': metrics,
+        'data_fingerprint': data_fingerprint,
+        **extra
+    }
+
+
+def is_artifact(obj):
+    """Vrai si l'objet chargé est un artefact (et non un estimateur seul, ancien format)"""
+    return isinstance(obj, dict) and 'format_version' in obj and ('model' in obj or 'model_file' in obj)
+
+
+class LazyArtifact(dict):
+    """Artefact dont l'estimateur est chargé depuis son fichier à part au premier accès à artifact['model']"""
+
+    def __init__(self, artifact, directory):
+        super().__init__(artifact)
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def __missing__(self, key):
+        if key != 'model':
+            raise KeyError(key)
+        with self._lock:
+            if 'model' not in self:
+                self['model'] = joblib.load(os.path.join(self.directory, self['model_file']))
+        return dict.__getitem__(self, 'model')
+
+    def __reduce__(self):
+        return LazyArtifact, (dict(self), self.directory)
+
+    def model_loaded(self):
+        """Vrai si l'estimateur a déjà été chargé"""
+        return dict.__contains__(self, 'model')
+
+
+def model_copy(artifact):
+    """
+    Copie modifiable de l'estimateur d'un artefact
+
+    Un estimateur à part encore non chargé est lu depuis son fichier sans être gardé dans l'artefact:
+    le worker qui sert l'artefact n'en conserve pas de copie privée.
+    """
+    if isinstance(artifact, LazyArtifact) and not artifact.model_loaded():
+        return joblib.load(os.path.join(artifact.directory, artifact['model_file']))
+    return copy.deepcopy(artifact['model'])
+
+
+def estimator_filename(model_name, version):
+    """Nom du fichier de l'estimateur d'un artefact servi sans lui"""
+    return f'{model_name}.estimator-{version}.joblib'
+
+
+def dump_artifact(artifact, path, separate_model=True):
+    """
+    Sauvegarde un artefact de façon atomique
+
+    Si separate_model et que l'artefact peut être servi sans l'estimateur (moteur compilé ou index
+    de voisins), l'estimateur est d'abord écrit dans son propre fichier, puis le fichier principal
+    qui y fait référence ('model_file'): un lecteur ne voit jamais de référence vers un fichier absent.
+
+    Returns:
+        str: Nom du fichier de l'estimateur, ou None s'il est resté dans le fichier principal
+    """
+    if not separate_model or (artifact.get('compiled') is None and not artifact.get('knn_index')):
+        atomic_dump(dict(artifact), path)
+        return None
+    directory = os.path.dirname(path)
+    model_file = estimator_filename(artifact['model_name'], artifact['version'])
+    atomic_dump(artifact['model'], os.path.join(directory, model_file))
+    atomic_dump({**{k: v for k, v in artifact.items() if k != 'model'}, 'model_file': model_file}, path)
+    return model_file
+
+
+def load_artifact(path, mmap=True):
+    """
+    Charge un fichier de modèle: tableaux projetés en mémoire (mmap_mode='r') si mmap,
+    estimateur chargé à la demande s'il est dans un fichier à part
+
+    Returns:
+        L'artefact (LazyArtifact si l'estimateur est à part), ou l'estimateur seul (ancien format)
+    """
+    loaded = joblib.load(path, mmap_mode='r' if mmap else None)
+    if isinstance(loaded, dict) and 'model_file' in loaded and 'model' not in loaded:
+        return LazyArtifact(loaded, os.path.dirname(path))
+    return loaded
+
+
+@contextmanager
+def file_lock(path):
+    """Verrou exclusif entre processus (et threads), porté par un fichier .lock"""
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _atomic_file(path, mode):
+    """
+    Fichier temporaire du même dossier, renommé en path par os.replace si l'écriture réussit (supprimé sinon):
+    un lecteur concurrent (registre de l'API, autre worker) voit soit l'ancien fichier complet, soit le
+    nouveau, jamais un fichier à moitié écrit.
+    """
+    directory, filename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f'.{filename}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_dump(obj, path):
+    """Sauvegarde un objet avec joblib de façon atomique"""
+    with _atomic_file(path, 'wb') as f:
+        joblib.dump(obj, f)
+
+
+def atomic_write_bytes(data, path):
+    """Écrit des octets dans un fichier de façon atomique"""
+    with _atomic_file(path, 'wb') as f:
+        f.write(data)
+
+
+def atomic_write_json(obj, path, **kwargs):
+    """Écrit un objet en JSON de façon atomique (kwargs transmis à json.dump)"""
+    with _atomic_file(path, 'w') as f:
+        json.dump(obj, f, **kwargs)
@@ -0,0 +1,131 @@
+"""
+Benchmark du chemin rapide de /predict (une ligne).
+
+Compare, pour chaque modèle entraîné de MODELS_DIR:
+  - pandas:   pd.DataFrame + scaler.transform + estimator.predict (ancien chemin)
+  - numpy:    parse_features + scale_row (tampon préalloué) + estimator.predict
+  - compilé:  parse_features + scale_row + moteur NumPy compilé (si disponible)
+  - index:    parse_features + scale_row + index de voisins projeté en mémoire (modèle KNN, voir knn_index)
+
+Mesures: latence médiane et p99 (µs), et pic d'allocation mémoire par appel (tracemalloc).
+
+Utilisation (depuis le dossier backend):
+    python benchmarks/bench_fast_path.py [--models-dir ../models] [--iterations 2000] [--output resultats.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import pandas as pd
+
+from api import FEATURES, artifact_scaling, predict_with_artifact
+from artifacts import is_artifact, load_artifact
+from compiled_models import predict_compiled
+from knn_index import KNNIndex
+from fast_predict import parse_features, scale_row
+
+SAMPLE = [25.0, 60.0, 15.0, 30.0, 20.0, 10.0, 1.5, 5.0, 500.0]
+
+
+def path_pandas(artifact, features):
+    input_df = pd.DataFrame([features], columns=artifact['features'])
+    return artifact['model'].predict(artifact['scaler'].transform(input_df))[0]
+
+
+def path_numpy(artifact, features):
+    mean, scale = artifact_scaling(artifact)
+    return artifact['model'].predict(scale_row(parse_features(features, len(FEATURES)), mean, scale))[0]
+
+
+def path_compiled(artifact, features):
+    mean, scale = artifact_scaling(artifact)
+    return predict_compiled(artifact['compiled'], scale_row(parse_features(features, len(FEATURES)), mean, scale))[0]
+
+
+def path_knn_index(artifact, features):
+    mean, scale = artifact_scaling(artifact)
+    return predict_with_artifact(artifact, scale_row(parse_features(features, len(FEATURES)), mean, scale))[0]
+
+
+def measure(func, artifact, iterations):
+    """Latences (µs) et pic d'allocation moyen (octets) d'une fonction de prédiction"""
+    for _ in range(min(50, iterations)):
+        func(artifact, SAMPLE)
+
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(artifact, SAMPLE)
+        latencies[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(200, iterations)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func(artifact, SAMPLE)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        'median_us': float(np.median(latencies) * 1e6),
+        'p99_us': float(np.percentile(latencies, 99) * 1e6),
+        'peak_alloc_bytes': float(np.mean(peaks))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du chemin rapide de prédiction")
+    parser.add_argument('--models-dir', default='../models')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--output', help="Fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = {}
+    for filename in sorted(os.listdir(args.models_dir)):
+        if not filename.endswith('.pkl'):
+            continue
+        artifact = load_artifact(os.path.join(args.models_dir, filename))
+        if not is_artifact(artifact):
+            print(f"  ! {filename}: ancien format (sans scaler), ignoré")
+            continue
+        model_name = filename[:-len('.pkl')]
+
+        # Les trois chemins doivent donner la même prédiction
+        expected = path_pandas(artifact, SAMPLE)
+        paths = {'pandas': path_pandas, 'numpy': path_numpy}
+        if artifact.get('compiled') is not None:
+            paths['compilé'] = path_compiled
+        if artifact.get('knn_index'):
+            # Index ouvert depuis --models-dir (predict_with_artifact réutilise celui conservé dans l'artefact)
+            artifact['knn_searcher'] = KNNIndex(os.path.join(args.models_dir, artifact['knn_index']['dir']))
+            paths['index'] = path_knn_index
+        for name, func in paths.items():
+            # Un index approché ('ivf') peut diverger: seuls les chemins exacts sont vérifiés
+            if name == 'index' and artifact['knn_index']['method'] == 'ivf':
+                continue
+            assert func(artifact, SAMPLE) == expected, f"{model_name}: le chemin '{name}' diverge"
+
+        results[model_name] = {name: measure(func, artifact, args.iterations) for name, func in paths.items()}
+
+    print(f"\n{'Modèle':<20}{'Chemin':<10}{'Médiane (µs)':>14}{'p99 (µs)':>12}{'Alloc (Kio)':>13}")
+    print("-" * 69)
+    for model_name, paths in results.items():
+        for name, m in paths.items():
+            print(f"{model_name:<20}{name:<10}{m['median_us']:>14.1f}{m['p99_us']:>12.1f}{m['peak_alloc_bytes'] / 1024:>13.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Résultats sauvegardés dans: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
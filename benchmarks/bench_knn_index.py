@@ -0,0 +1,135 @@
+"""
+Benchmark de l'index de voisins du modèle KNN (knn_index).
+
+Pour chaque taille, sur des lignes synthétiques tirées de generate_dataset
+(mises à l'échelle comme à l'entraînement):
+  - scikit-learn: KNeighborsClassifier.fit puis predict (référence)
+  - kd_tree:      index exact enregistré puis rouvert en mmap
+  - ivf:          index approché (listes inversées), pour plusieurs nprobe
+
+Mesures: durée de construction, durée d'ouverture, latence par requête
+(lot de --queries lignes et ligne seule), rappel@k face à la recherche exacte
+et accord des prédictions avec scikit-learn.
+
+Utilisation (depuis le dossier backend):
+    python benchmarks/bench_knn_index.py [--sizes 10000 100000 1000000] [--output resultats.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import pandas as pd
+
+from api import DATA_PATH, FEATURES, TARGET
+from generate_dataset import fit_generator, sample_rows
+from knn_index import KNNIndex, build_index, recall_report
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def single_row_us(predict, X, repeats=200):
+    """Latence médiane (µs) d'une prédiction ligne par ligne"""
+    latencies = []
+    for row in X[:repeats]:
+        start = time.perf_counter()
+        predict(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies) * 1e6)
+
+
+def bench_size(generator, n_rows, n_queries, k, nprobes, work_dir, seed):
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(seed)
+    data = sample_rows(generator, n_rows + n_queries, rng)
+    X = data[FEATURES].fillna(data[FEATURES].median()).to_numpy(dtype=np.float64)
+    X = StandardScaler().fit_transform(X)
+    y = data[TARGET].to_numpy()
+    X_fit, y_fit, X_queries = X[:n_rows], y[:n_rows], X[n_rows:]
+
+    model, fit_seconds = timed(KNeighborsClassifier(n_neighbors=k).fit, X_fit, y_fit)
+    expected, sklearn_seconds = timed(model.predict, X_queries)
+    results = {'sklearn': {'fit_seconds': fit_seconds,
+                           'query_us': sklearn_seconds / n_queries * 1e6,
+                           'single_row_us': single_row_us(model.predict, X_queries)}}
+
+    exact_path = os.path.join(work_dir, f'kd_tree-{n_rows}')
+    build_seconds = build_index(exact_path, X_fit, y_fit, method='kd_tree')
+    exact, open_seconds = timed(KNNIndex, exact_path)
+    predicted, query_seconds = timed(exact.predict, X_queries, k)
+    results['kd_tree'] = {'build_seconds': build_seconds, 'open_seconds': open_seconds,
+                          'query_us': query_seconds / n_queries * 1e6,
+                          'single_row_us': single_row_us(lambda row: exact.predict(row, k), X_queries),
+                          'agreement': float(np.mean(predicted == expected))}
+
+    ivf_path = os.path.join(work_dir, f'ivf-{n_rows}')
+    build_seconds = build_index(ivf_path, X_fit, y_fit, method='ivf')
+    ivf, open_seconds = timed(KNNIndex, ivf_path)
+    results['ivf'] = {'build_seconds': build_seconds, 'open_seconds': open_seconds,
+                      'n_lists': ivf.meta['n_lists'], 'nprobe': {}}
+    for nprobe in nprobes:
+        recall = recall_report(ivf, exact, X_queries, k, nprobe)
+        predicted = ivf.predict(X_queries, k, nprobe=nprobe)
+        results['ivf']['nprobe'][nprobe] = {
+            'query_us': recall['query_us'],
+            'single_row_us': single_row_us(lambda row: ivf.predict(row, k, nprobe=nprobe), X_queries),
+            'recall_at_k': recall['recall_at_k'],
+            'agreement': float(np.mean(predicted == expected))
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index de voisins KNN")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--source', default=DATA_PATH, help="Jeu de référence du générateur")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    generator = fit_generator(pd.read_csv(args.source))
+    work_dir = tempfile.mkdtemp(prefix='bench-knn-')
+    results = {}
+    try:
+        for n_rows in args.sizes:
+            print(f"→ {n_rows} lignes")
+            results[n_rows] = bench_size(generator, n_rows, args.queries, args.k, args.nprobe, work_dir, args.seed)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{'Lignes':>10}  {'Méthode':<14}{'Construction (s)':>18}{'Lot (µs/ligne)':>16}{'Ligne (µs)':>12}{'Rappel@k':>10}{'Accord':>8}")
+    print("-" * 90)
+    for n_rows, r in results.items():
+        print(f"{n_rows:>10}  {'scikit-learn':<14}{r['sklearn']['fit_seconds']:>18.3f}"
+              f"{r['sklearn']['query_us']:>16.1f}{r['sklearn']['single_row_us']:>12.1f}{'':>10}{'':>8}")
+        m = r['kd_tree']
+        print(f"{'':>10}  {'kd_tree':<14}{m['build_seconds']:>18.3f}{m['query_us']:>16.1f}"
+              f"{m['single_row_us']:>12.1f}{1.0:>10.3f}{m['agreement']:>8.3f}")
+        for nprobe, m in r['ivf']['nprobe'].items():
+            print(f"{'':>10}  {f'ivf nprobe={nprobe}':<14}{r['ivf']['build_seconds']:>18.3f}{m['query_us']:>16.1f}"
+                  f"{m['single_row_us']:>12.1f}{m['recall_at_k']:>10.3f}{m['agreement']:>8.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Résultats sauvegardés dans: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
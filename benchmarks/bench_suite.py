@@ -0,0 +1,277 @@
+"""
+Suite de benchmarks de l'API et des scripts d'analyse, à plusieurs tailles de données.
+
+Pour chaque taille (par défaut 5 000, 100 000 et 1 000 000 de lignes):
+  - load_and_preprocess_data: à froid (sans cache) puis à chaud (cache .npy)
+  - /train: durée d'entraînement (fit) et durée totale (fit + évaluation + compilation + sauvegarde)
+    de chaque modèle de MODELS, via fit_and_save (la fonction exécutée par les tâches /train)
+  - /predict: latence d'une ligne (médiane, p99) pour chaque modèle entraîné, via le client de test Flask
+  - AnalysePollution: chargement, exploration, nettoyage, statistiques, corrélations et sauvegarde
+  - VisualisationPollution.generer_toutes_visualisations
+
+Les jeux de données sont générés par generate_dataset.py (marges et corrélations de chaque classe
+apprises sur pollution.csv, graine fixe) et conservés dans le dossier de travail pour les exécutions suivantes. Les résultats sont
+enregistrés en JSON (avec le commit git et les versions des bibliothèques); --compare affiche
+le rapport avec une exécution précédente pour repérer les régressions entre deux commits.
+
+Utilisation (depuis le dossier backend):
+    python benchmarks/bench_suite.py [--sizes 5000 100000 1000000] [--models SVM KNN]
+        [--output resultats.json] [--compare precedents.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+import numpy as np
+import pandas as pd
+
+import api
+from artifacts import load_artifact
+from generate_dataset import generate_dataset
+from model_registry import ModelRegistry
+
+SAMPLE = [25.0, 60.0, 15.0, 30.0, 20.0, 10.0, 1.5, 5.0, 500.0]
+DEFAULT_SIZES = [5000, 100000, 1000000]
+
+# Étapes de VisualisationPollution.generer_toutes_visualisations, dans le même ordre
+VISUALISATION_STEPS = [
+    'distribution_air_quality', 'histogrammes_variables', 'histogrammes_pm25_pm10', 'boxplots_variables',
+    'boxplots_pm25_pm10', 'graphes_densite', 'heatmap_correlation', 'scatter_matrix_plot',
+    'pairplot_complet', 'correlations_air_quality', 'scatter_top_correlations'
+]
+
+# Au-delà de ce nombre de lignes d'entraînement, le modèle est ignoré (coût quadratique ou pire)
+DEFAULT_MAX_FIT_ROWS = {'SVM': 100000}
+
+
+def timed(func, *args, **kwargs):
+    """Exécute func en silence (sorties console supprimées); retourne (résultat, durée en secondes)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        return result, time.perf_counter() - start
+
+
+def use_workdir(workdir):
+    """Fait pointer l'API (données, cache, modèles) vers un dossier de travail"""
+    api.DATA_PATH = os.path.join(workdir, 'pollution.csv')
+    api.CACHE_DIR = os.path.join(workdir, 'cache')
+    api.MODELS_DIR = os.path.join(workdir, 'models')
+    # Même chargeur que le registre servi (artefacts projetés en mémoire, estimateur à la demande)
+    api.registry = ModelRegistry(api.MODELS_DIR, max_size=len(api.MODELS),
+                                 loader=lambda path: load_artifact(path, mmap=api.MODEL_MMAP))
+    api.models_manifest.models_dir = api.MODELS_DIR
+    os.makedirs(api.MODELS_DIR, exist_ok=True)
+    os.makedirs(api.CACHE_DIR, exist_ok=True)
+
+
+def bench_load():
+    shutil.rmtree(api.CACHE_DIR)
+    os.makedirs(api.CACHE_DIR)
+    (ok, message), cold = timed(api.load_and_preprocess_data)
+    if not ok:
+        raise RuntimeError(message)
+    _, warm = timed(api.load_and_preprocess_data)
+    return {'cold_seconds': cold, 'cached_seconds': warm, 'train_rows': int(len(api.X_train))}
+
+
+def bench_train(model_names, max_fit_rows):
+    results = {}
+    for model_name in model_names:
+        limit = max_fit_rows.get(model_name)
+        if limit is not None and len(api.X_train) > limit:
+            results[model_name] = {'skipped': f"plus de {limit} lignes d'entraînement"}
+            continue
+        outcome, total = timed(api.fit_and_save, model_name, api.X_train, api.y_train, api.X_test, api.y_test)
+        results[model_name] = {
+            'fit_seconds': outcome['fit_seconds'],
+            'total_seconds': total,
+            'accuracy': outcome['metrics']['accuracy'],
+            'compiled': outcome['compiled']
+        }
+    return results
+
+
+def bench_predict(model_names, iterations):
+    client = api.create_app(load_data=False).test_client()
+    results = {}
+    for model_name in model_names:
+        if not os.path.exists(api.registry.model_path(model_name)):
+            continue
+        payload = {'model_name': model_name, 'features': SAMPLE}
+        response = client.post('/predict', json=payload)
+        if response.status_code != 200:
+            results[model_name] = {'error': response.get_json().get('error')}
+            continue
+        latencies = np.empty(iterations)
+        for i in range(iterations):
+            start = time.perf_counter()
+            client.post('/predict', json=payload)
+            latencies[i] = time.perf_counter() - start
+        results[model_name] = {
+            'median_us': float(np.median(latencies) * 1e6),
+            'p99_us': float(np.percentile(latencies, 99) * 1e6)
+        }
+    return results
+
+
+def bench_analysis(workdir, visualisations):
+    from analyse_pollution import AnalysePollution
+
+    results = {}
+    previous_dir = os.getcwd()
+    # Les scripts d'analyse écrivent pollution_clean.csv et images/ dans le dossier courant
+    os.chdir(workdir)
+    try:
+        def analyse_end_to_end():
+            analyse = AnalysePollution('pollution.csv')
+            analyse.charger_donnees()
+            analyse.explorer_donnees()
+            analyse.nettoyer_donnees()
+            analyse.statistiques_descriptives()
+            analyse.analyser_correlations()
+            analyse.sauvegarder_resultats()
+
+        _, results['analyse_seconds'] = timed(analyse_end_to_end)
+
+        if visualisations:
+            import matplotlib.pyplot as plt
+            from visualisations import VisualisationPollution
+            viz, results['visualisations_load_seconds'] = timed(VisualisationPollution, 'pollution_clean.csv')
+            # Les étapes de generer_toutes_visualisations, mesurées une à une: l'échec d'un graphique
+            # est enregistré sans interrompre la suite
+            steps, errors = {}, {}
+            for step in VISUALISATION_STEPS:
+                try:
+                    _, steps[f'{step}_seconds'] = timed(getattr(viz, step))
+                except Exception as e:
+                    errors[step] = f"{type(e).__name__}: {e}"
+                finally:
+                    plt.close('all')
+            results['visualisations_seconds'] = sum(steps.values())
+            results['visualisations'] = steps
+            if errors:
+                results['visualisations_errors'] = errors
+    finally:
+        os.chdir(previous_dir)
+    return results
+
+
+def environment():
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__,
+        'cpu_count': os.cpu_count()
+    }
+
+
+def flatten(results, prefix=''):
+    """{'a': {'b': 1.0}} -> {'a.b': 1.0} (durées et latences uniquement)"""
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{name}.'))
+        elif isinstance(value, float) and (key.endswith('_seconds') or key.endswith('_us')):
+            flat[name] = value
+    return flat
+
+
+def compare(current, previous, previous_path):
+    previous = flatten(previous)
+    print(f"\nComparaison avec {previous_path} (rapport > 1: plus lent)")
+    print(f"{'Mesure':<60}{'Avant':>12}{'Après':>12}{'Rapport':>10}")
+    print("-" * 94)
+    for name, value in flatten(current).items():
+        if name in previous and previous[name] > 0:
+            ratio = value / previous[name]
+            flag = '  ⚠' if ratio > 1.2 else ''
+            print(f"{name:<60}{previous[name]:>12.4g}{value:>12.4g}{ratio:>10.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de l'API et des scripts d'analyse")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--models', nargs='+', default=list(api.MODELS), choices=list(api.MODELS))
+    parser.add_argument('--source', default=api.DATA_PATH,
+                        help="Jeu de données de référence du générateur")
+    parser.add_argument('--workdir', default='../bench', help="Dossier des jeux de données générés et des modèles")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--predict-iterations', type=int, default=500)
+    parser.add_argument('--no-visualisations', action='store_true', help="Ne pas mesurer generer_toutes_visualisations")
+    parser.add_argument('--max-fit-rows', type=int, default=None,
+                        help="Ignorer tout modèle au-delà de ce nombre de lignes d'entraînement "
+                             "(par défaut: SVM limité à 100 000)")
+    parser.add_argument('--output', help="Fichier JSON des résultats (défaut: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Fichier JSON d'une exécution précédente")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        # Lu avant l'exécution: --output peut désigner le même fichier
+        with open(args.compare) as f:
+            previous = json.load(f)['results']
+
+    max_fit_rows = DEFAULT_MAX_FIT_ROWS if args.max_fit_rows is None else dict.fromkeys(api.MODELS, args.max_fit_rows)
+    source = os.path.abspath(args.source)
+    meta = {**environment(), 'seed': args.seed, 'source': os.path.basename(source), 'generator': 'generate_dataset'}
+
+    results = {}
+    for n_rows in args.sizes:
+        workdir = os.path.abspath(os.path.join(args.workdir, f'{n_rows}_synthetique_seed{args.seed}'))
+        os.makedirs(workdir, exist_ok=True)
+        data_path = os.path.join(workdir, 'pollution.csv')
+        if not os.path.exists(data_path):
+            generate_dataset(source, data_path, n_rows, args.seed)
+        use_workdir(workdir)
+
+        print(f"\n=== {n_rows} lignes ===")
+        size_results = {'load_and_preprocess_data': bench_load()}
+        print(f"  load_and_preprocess_data: {size_results['load_and_preprocess_data']['cold_seconds']:.2f} s")
+        size_results['train'] = bench_train(args.models, max_fit_rows)
+        for model_name, r in size_results['train'].items():
+            print(f"  /train {model_name}: " + (r['skipped'] if 'skipped' in r else f"fit {r['fit_seconds']:.2f} s"))
+        size_results['predict'] = bench_predict(args.models, args.predict_iterations)
+        for model_name, r in size_results['predict'].items():
+            print(f"  /predict {model_name}: " + (r['error'] if 'error' in r else f"médiane {r['median_us']:.0f} µs"))
+        size_results['analysis'] = bench_analysis(workdir, not args.no_visualisations)
+        print("  " + ", ".join(f"{k}: {v:.2f} s" for k, v in size_results['analysis'].items() if isinstance(v, float)))
+        for step, error in size_results['analysis'].get('visualisations_errors', {}).items():
+            print(f"  ! {step}: {error}")
+        results[str(n_rows)] = size_results
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"{meta['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2)
+    print(f"\n✓ Résultats sauvegardés dans: {output}")
+
+    if previous is not None:
+        compare(results, previous, args.compare)
+
+
+if __name__ == "__main__":
+    main()
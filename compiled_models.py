@@ -0,0 +1,210 @@
+"""
+Moteur d'inférence NumPy pour les modèles scikit-learn entraînés.
+
+Après l'entraînement, les modèles supportés sont « compilés » en tableaux plats:
+- DecisionTree / RandomForest: tableaux de nœuds de tous les arbres concaténés
+- LogisticRegression / SGDClassifier: matrice de poids et biais
+- GaussianNB: moyennes, variances et constantes par classe
+- SVM (SVC, noyaux linear/rbf/poly/sigmoid): vecteurs de support et matrice de coefficients un-contre-un
+
+L'évaluation n'utilise que des opérations NumPy vectorisées, sans la validation
+d'entrée ni le surcoût Python de predict() de scikit-learn. Les prédictions
+compilées doivent être vérifiées contre scikit-learn (verify_compiled) avant
+d'être servies.
+"""
+
+import numpy as np
+
+
+def compile_model(model):
+    """
+    Convertit un estimateur entraîné en représentation à base de tableaux
+
+    Returns:
+        dict de tableaux numpy (avec 'kind' et 'classes'), ou None si le modèle n'est pas supporté
+    """
+    name = type(model).__name__
+    if name in ('DecisionTreeClassifier', 'RandomForestClassifier'):
+        return _compile_trees(model)
+    if name in ('LogisticRegression', 'SGDClassifier'):
+        return _compile_linear(model)
+    if name == 'GaussianNB':
+        return _compile_gaussian_nb(model)
+    if name == 'SVC' and model.kernel in ('linear', 'rbf', 'poly', 'sigmoid'):
+        return _compile_svc(model)
+    return None
+
+
+def predict_compiled(compiled, X):
+    """Prédit les classes d'une matrice (n_lignes, n_caractéristiques) déjà mise à l'échelle"""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    return _EVALUATORS[str(compiled['kind'])](compiled, X)
+
+
+def verify_compiled(compiled, model, X):
+    """
+    Compare les prédictions compilées à celles de scikit-learn
+
+    Returns:
+        float: Proportion de lignes pour lesquelles les deux prédictions sont identiques
+    """
+    if len(X) == 0:
+        return 1.0
+    return float(np.mean(predict_compiled(compiled, X) == model.predict(X)))
+
+
+# --- Arbres de décision et forêts ---
+
+def _compile_trees(model):
+    trees = [est.tree_ for est in model.estimators_] if hasattr(model, 'estimators_') else [model.tree_]
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        # Une feuille pointe sur elle-même: on peut parcourir tous les arbres un nombre fixe de pas
+        left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+        right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        counts = tree.value[:, 0, :]
+        value.append(counts / counts.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += tree.node_count
+    return {
+        'kind': 'trees',
+        'classes': np.asarray(model.classes_),
+        'left': np.concatenate(left).astype(np.intp),
+        'right': np.concatenate(right).astype(np.intp),
+        'feature': np.concatenate(feature).astype(np.intp),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'value': np.concatenate(value).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.intp),
+        'max_depth': np.int64(max(tree.max_depth for tree in trees))
+    }
+
+
+def _predict_trees(compiled, X):
+    # Comme scikit-learn, comparer les valeurs converties en float32 aux seuils float64
+    X = X.astype(np.float32)
+    feature, threshold, left, right = compiled['feature'], compiled['threshold'], compiled['left'], compiled['right']
+
+    if X.shape[0] == 1 and len(compiled['roots']) == 1:
+        # Une ligne, un arbre: parcours scalaire jusqu'à la feuille, plus rapide que le parcours vectorisé
+        x, node = X[0], int(compiled['roots'][0])
+        while left[node] != node:
+            node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+        return compiled['classes'][[np.argmax(compiled['value'][node])]]
+
+    rows = np.arange(X.shape[0])
+    nodes = np.repeat(compiled['roots'][:, None], X.shape[0], axis=1)
+    for _ in range(int(compiled['max_depth'])):
+        go_left = X[rows, feature[nodes]] <= threshold[nodes]
+        nodes = np.where(go_left, left[nodes], right[nodes])
+    # Moyenne des probabilités des arbres (somme séquentielle, comme RandomForestClassifier.predict_proba)
+    proba = compiled['value'][nodes].sum(axis=0) / nodes.shape[0]
+    return compiled['classes'][np.argmax(proba, axis=1)]
+
+
+# --- Modèles linéaires (régression logistique, SGD) ---
+
+def _compile_linear(model):
+    return {
+        'kind': 'linear',
+        'classes': np.asarray(model.classes_),
+        'coef': np.ascontiguousarray(model.coef_.T, dtype=np.float64),
+        'intercept': np.asarray(model.intercept_, dtype=np.float64)
+    }
+
+
+def _predict_linear(compiled, X):
+    scores = X @ compiled['coef'] + compiled['intercept']
+    if scores.shape[1] == 1:
+        return compiled['classes'][(scores[:, 0] > 0).astype(np.intp)]
+    return compiled['classes'][np.argmax(scores, axis=1)]
+
+
+# --- Bayes naïf gaussien ---
+
+def _compile_gaussian_nb(model):
+    var = np.asarray(model.var_, dtype=np.float64)
+    return {
+        'kind': 'gaussian_nb',
+        'classes': np.asarray(model.classes_),
+        'theta': np.asarray(model.theta_, dtype=np.float64),
+        'inv_var': 1.0 / var,
+        'const': np.log(model.class_prior_) - 0.5 * np.sum(np.log(2.0 * np.pi * var), axis=1)
+    }
+
+
+def _predict_gaussian_nb(compiled, X):
+    diff = X[:, None, :] - compiled['theta'][None, :, :]
+    joint_log_likelihood = compiled['const'] - 0.5 * np.sum(diff * diff * compiled['inv_var'], axis=2)
+    return compiled['classes'][np.argmax(joint_log_likelihood, axis=1)]
+
+
+# --- Machines à vecteurs de support (un-contre-un, comme libsvm) ---
+
+def _compile_svc(model):
+    classes = np.asarray(model.classes_)
+    n_classes = len(classes)
+    dual_coef = np.asarray(model.dual_coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    if n_classes == 2:
+        # scikit-learn inverse le signe en binaire; on revient à la convention de libsvm
+        dual_coef, intercept = -dual_coef, -intercept
+
+    starts = np.concatenate([[0], np.cumsum(model.n_support_)])
+    pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+    weights = np.zeros((len(pairs), len(model.support_vectors_)))
+    winner_i = np.zeros((len(pairs), n_classes))
+    winner_j = np.zeros((len(pairs), n_classes))
+    for p, (i, j) in enumerate(pairs):
+        weights[p, starts[i]:starts[i + 1]] = dual_coef[j - 1, starts[i]:starts[i + 1]]
+        weights[p, starts[j]:starts[j + 1]] = dual_coef[i, starts[j]:starts[j + 1]]
+        winner_i[p, i] = 1
+        winner_j[p, j] = 1
+
+    support_vectors = np.asarray(model.support_vectors_, dtype=np.float64)
+    return {
+        'kind': 'svc',
+        'classes': classes,
+        'kernel': np.array(model.kernel),
+        'gamma': np.float64(model._gamma),
+        'coef0': np.float64(model.coef0),
+        'degree': np.int64(model.degree),
+        'support_vectors': support_vectors,
+        'sv_sq_norms': np.einsum('ij,ij->i', support_vectors, support_vectors),
+        'weights_t': np.ascontiguousarray(weights.T),
+        'intercept': intercept,
+        'winner_i': winner_i,
+        'winner_j': winner_j
+    }
+
+
+def _predict_svc(compiled, X):
+    dot = X @ compiled['support_vectors'].T
+    kernel = str(compiled['kernel'])
+    if kernel == 'linear':
+        K = dot
+    elif kernel == 'rbf':
+        sq_dist = np.einsum('ij,ij->i', X, X)[:, None] + compiled['sv_sq_norms'][None, :] - 2.0 * dot
+        K = np.exp(-compiled['gamma'] * sq_dist)
+    elif kernel == 'poly':
+        K = (compiled['gamma'] * dot + compiled['coef0']) ** int(compiled['degree'])
+    else:
+        K = np.tanh(compiled['gamma'] * dot + compiled['coef0'])
+    decision = K @ compiled['weights_t'] + compiled['intercept']
+    positive = decision > 0
+    votes = positive @ compiled['winner_i'] + (~positive) @ compiled['winner_j']
+    return compiled['classes'][np.argmax(votes, axis=1)]
+
+
+_EVALUATORS = {
+    'trees': _predict_trees,
+    'linear': _predict_linear,
+    'gaussian_nb': _predict_gaussian_nb,
+    'svc': _predict_svc
+}
@@ -0,0 +1,86 @@
+"""
+Validation croisée stratifiée en k plis, plis ajustés en parallèle.
+
+Chaque pli ajuste son propre StandardScaler sur ses lignes d'entraînement
+(aucune fuite d'information du pli de test), puis le modèle. Les k plis et
+l'ajustement final sur toutes les données sont lancés ensemble avec joblib
+sur tous les cœurs: avec au moins k + 1 cœurs, la durée totale reste proche
+de celle d'un seul entraînement.
+"""
+
+import importlib
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from streaming_training import metrics_from_confusion
+
+METRIC_NAMES = ('accuracy', 'precision', 'recall', 'f1_score')
+
+
+def _fit(spec, X, y, train_idx, test_idx, classes):
+    """Ajuste scaler et modèle sur train_idx; évalue sur test_idx (None: ajustement final)"""
+    from sklearn.metrics import confusion_matrix
+    from sklearn.preprocessing import StandardScaler
+
+    module_name, class_name, params = spec
+    model = getattr(importlib.import_module(module_name), class_name)(**params)
+    scaler = StandardScaler()
+    start = time.perf_counter()
+    X_train = scaler.fit_transform(X[train_idx])
+    model.fit(X_train, y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    if test_idx is None:
+        return {'model': model, 'scaler': scaler, 'fit_seconds': fit_seconds}
+    y_pred = model.predict(scaler.transform(X[test_idx]))
+    confusion = confusion_matrix(y[test_idx], y_pred, labels=classes)
+    return {'metrics': metrics_from_confusion(confusion), 'fit_seconds': fit_seconds,
+            'train_rows': int(len(train_idx)), 'test_rows': int(len(test_idx))}
+
+
+def cross_validate(spec, X, y, k=5, random_state=42, n_jobs=-1):
+    """
+    Validation croisée stratifiée en k plis et ajustement final sur toutes les lignes
+
+    Args:
+        spec (tuple): (module, classe, paramètres) de l'estimateur, comme dans MODELS
+        X (ndarray): Caractéristiques non mises à l'échelle
+        y (ndarray): Classes
+        k (int): Nombre de plis
+        n_jobs (int): Processus joblib (-1: tous les cœurs)
+
+    Returns:
+        (modèle final, scaler final, rapport: plis, moyenne, écart-type, matrice de confusion cumulée, durées)
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    X, y = np.asarray(X), np.asarray(y)
+    classes = np.unique(y)
+    folds = list(StratifiedKFold(n_splits=k, shuffle=True, random_state=random_state).split(X, y))
+
+    start = time.perf_counter()
+    outcomes = Parallel(n_jobs=n_jobs)(
+        delayed(_fit)(spec, X, y, train_idx, test_idx, classes)
+        for train_idx, test_idx in folds + [(np.arange(len(y)), None)]
+    )
+    wall_seconds = time.perf_counter() - start
+    fold_outcomes, final = outcomes[:-1], outcomes[-1]
+
+    values = {name: np.array([o['metrics'][name] for o in fold_outcomes]) for name in METRIC_NAMES}
+    confusion = np.sum([o['metrics']['confusion_matrix'] for o in fold_outcomes], axis=0)
+    sequential_seconds = sum(o['fit_seconds'] for o in outcomes)
+    report = {
+        'k': k,
+        'folds': [{**{name: o['metrics'][name] for name in METRIC_NAMES},
+                   'fit_seconds': o['fit_seconds'], 'train_rows': o['train_rows'], 'test_rows': o['test_rows']}
+                  for o in fold_outcomes],
+        'mean': {name: float(v.mean()) for name, v in values.items()},
+        'std': {name: float(v.std(ddof=1)) if len(v) > 1 else 0.0 for name, v in values.items()},
+        'confusion_matrix': confusion.astype(np.int64).tolist(),
+        'wall_seconds': wall_seconds,
+        'sequential_fit_seconds': sequential_seconds,
+        'final_fit_seconds': final['fit_seconds']
+    }
+    return final['model'], final['scaler'], report
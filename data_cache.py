@@ -0,0 +1,110 @@
+"""
+Cache disque du jeu de données prétraité (nettoyé, séparé et mis à l'échelle).
+
+Les tableaux sont enregistrés en .npy et rechargés avec np.load(mmap_mode='r'):
+un démarrage ultérieur de l'API (ou de chaque worker gunicorn) ne fait que
+projeter les fichiers en mémoire, quel que soit le nombre de lignes du CSV.
+Le cache est indexé par l'empreinte SHA-256 du fichier CSV; l'empreinte
+n'est recalculée que si la taille ou la date de modification du fichier change.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+
+from artifacts import atomic_write_json
+
+# À incrémenter dès que le prétraitement de load_and_preprocess_data change
+PREPROCESSING_VERSION = 1
+
+ARRAY_NAMES = ('X', 'y', 'train_idx', 'test_idx', 'X_train', 'X_test', 'y_train', 'y_test')
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Empreinte SHA-256 d'un fichier, lue par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'index.json')) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_index(cache_dir, index):
+    atomic_write_json(index, os.path.join(cache_dir, 'index.json'), indent=2)
+
+
+def data_fingerprint(cache_dir, data_path):
+    """
+    Empreinte du fichier de données, mémorisée dans l'index du cache
+
+    Le fichier n'est relu entièrement que si sa taille ou sa date de modification a changé.
+    """
+    stat = os.stat(data_path)
+    key = os.path.abspath(data_path)
+    index = _read_index(cache_dir)
+    entry = index.get(key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = file_fingerprint(data_path)
+    index[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+    try:
+        _write_index(cache_dir, index)
+    except OSError:
+        pass  # cache en lecture seule: l'empreinte sera simplement recalculée au prochain démarrage
+    return digest
+
+
+def _entry_dir(cache_dir, digest):
+    return os.path.join(cache_dir, f'{digest[:16]}-v{PREPROCESSING_VERSION}')
+
+
+def load_split(cache_dir, digest):
+    """
+    Charge un prétraitement mis en cache (tableaux projetés en mémoire, lecture seule)
+
+    Returns:
+        dict des tableaux + 'scaler', ou None si le cache est absent ou incomplet
+    """
+    entry_dir = _entry_dir(cache_dir, digest)
+    try:
+        split = {name: np.load(os.path.join(entry_dir, f'{name}.npy'), mmap_mode='r') for name in ARRAY_NAMES}
+        split['scaler'] = joblib.load(os.path.join(entry_dir, 'scaler.joblib'))
+    except (FileNotFoundError, ValueError, EOFError):
+        return None
+    return split
+
+
+def save_split(cache_dir, digest, arrays, scaler):
+    """
+    Enregistre un prétraitement dans le cache
+
+    L'écriture se fait dans un dossier temporaire renommé à la fin: un worker concurrent
+    ne peut jamais lire un cache partiellement écrit.
+    """
+    entry_dir = _entry_dir(cache_dir, digest)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+    try:
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(arrays[name]))
+        joblib.dump(scaler, os.path.join(tmp_dir, 'scaler.joblib'))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump({'sha256': digest, 'preprocessing_version': PREPROCESSING_VERSION,
+                       'n_rows': int(len(arrays['y']))}, f, indent=2)
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Un autre processus a déjà publié le même cache (ou le disque est en lecture seule)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,51 @@
+"""
+Ajout de lectures étiquetées au fichier de données.
+
+Les lignes sont ajoutées à la fin du CSV, dans l'ordre des colonnes de son
+en-tête, sous un verrou de fichier (artifacts.file_lock): plusieurs workers gunicorn
+peuvent recevoir des lectures en même temps sans entrelacer leurs écritures.
+Le coût d'un ajout ne dépend que du nombre de nouvelles lignes.
+"""
+
+import csv
+import os
+
+
+def append_rows(data_path, features, target, X, y):
+    """
+    Ajoute des lignes étiquetées à la fin du fichier CSV
+
+    Args:
+        data_path (str): Fichier CSV existant (avec en-tête)
+        features (list): Noms des colonnes de X
+        target (str): Nom de la colonne de la classe
+        X (ndarray): Matrice (n_lignes, len(features))
+        y (ndarray): Classes des lignes
+
+    Returns:
+        int: Nombre de lignes ajoutées
+
+    Raises:
+        ValueError: si l'en-tête du fichier ne contient pas exactement features + target
+    """
+    with open(data_path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        # Ne pas coller la première ligne ajoutée à une dernière ligne sans fin de ligne
+        needs_newline = False
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+
+    if sorted(header) != sorted(list(features) + [target]):
+        raise ValueError(f"Colonnes du fichier de données inattendues: {header}.")
+    positions = {name: i for i, name in enumerate(features)}
+
+    with open(data_path, 'a', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        writer = csv.writer(f)
+        for row, label in zip(X, y):
+            writer.writerow([int(label) if name == target else repr(float(row[positions[name]])) for name in header])
+        f.flush()
+        os.fsync(f.fileno())
+    return len(y)
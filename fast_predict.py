@@ -0,0 +1,78 @@
+"""
+Chemin rapide de prédiction, sans pandas.
+
+Les valeurs reçues sont validées puis mises à l'échelle directement avec la
+moyenne et l'écart-type du StandardScaler de l'artefact, dans un tampon NumPy
+préalloué par thread: aucune DataFrame n'est construite et scaler.transform
+(validation d'entrée, vérification des noms de colonnes) n'est pas appelé.
+Le résultat est identique à celui de scaler.transform.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+_local = threading.local()
+
+
+def parse_features(values, n_features):
+    """
+    Valide une liste de valeurs de caractéristiques
+
+    Returns:
+        list de float
+
+    Raises:
+        ValueError: nombre de valeurs incorrect, valeur non numérique ou non finie
+    """
+    if not isinstance(values, (list, tuple)) or len(values) != n_features:
+        received = len(values) if isinstance(values, (list, tuple)) else type(values).__name__
+        raise ValueError(f"Nombre incorrect de caractéristiques. Attendu: {n_features}, Reçu: {received}.")
+    parsed = []
+    for value in values:
+        if isinstance(value, bool) or value is None:
+            raise ValueError("Toutes les valeurs des caractéristiques doivent être numériques.")
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError("Toutes les valeurs des caractéristiques doivent être numériques.") from None
+        if not math.isfinite(number):
+            raise ValueError("Les valeurs des caractéristiques doivent être finies.")
+        parsed.append(number)
+    return parsed
+
+
+def scaler_params(scaler):
+    """Moyenne et échelle d'un StandardScaler ajusté, sous forme de tableaux float64 (1, n)"""
+    n_features = scaler.n_features_in_
+    mean = scaler.mean_ if getattr(scaler, 'with_mean', True) and scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if getattr(scaler, 'with_std', True) and scaler.scale_ is not None else np.ones(n_features)
+    return (np.asarray(mean, dtype=np.float64).reshape(1, -1),
+            np.asarray(scale, dtype=np.float64).reshape(1, -1))
+
+
+def _row_buffer(n_features):
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None or buffer.shape[1] != n_features:
+        buffer = _local.buffer = np.empty((1, n_features), dtype=np.float64)
+    return buffer
+
+
+def scale_row(values, mean, scale):
+    """
+    Met à l'échelle une ligne dans le tampon préalloué du thread courant
+
+    Le tableau retourné est réutilisé au prochain appel dans le même thread:
+    il doit être consommé (prédiction) avant l'appel suivant.
+    """
+    buffer = _row_buffer(mean.shape[1])
+    buffer[0] = values
+    np.subtract(buffer, mean, out=buffer)
+    np.divide(buffer, scale, out=buffer)
+    return buffer
+
+
+def scale_matrix(matrix, mean, scale):
+    """Met à l'échelle une matrice (n_lignes, n_caractéristiques), équivalent de scaler.transform"""
+    return (np.asarray(matrix, dtype=np.float64) - mean) / scale
@@ -0,0 +1,162 @@
+"""
+Générateur de jeux de données synthétiques de pollution, pour les tests de montée en charge.
+
+Pour chaque classe de Qualite_air, le générateur apprend sur le jeu de référence:
+  - la distribution marginale de chacune des 9 caractéristiques (quantiles empiriques)
+  - la structure de corrélation entre caractéristiques (corrélation des rangs, copule gaussienne)
+  - la proportion de valeurs manquantes par caractéristique
+  - la proportion de la classe
+
+Les lignes sont ensuite tirées par blocs: vecteur gaussien corrélé -> probabilités uniformes
+-> quantiles empiriques de chaque caractéristique. Le fichier produit a le même schéma que
+pollution.csv; la mémoire utilisée ne dépend que de la taille des blocs, pas du nombre de lignes.
+Une même graine et une même taille de bloc donnent exactement le même fichier.
+
+Utilisation:
+    python generate_dataset.py --rows 1000000 --output ../data/pollution_1M.csv
+        [--source ../data/pollution.csv] [--seed 42] [--chunk-rows 100000]
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from scipy.stats import rankdata
+
+FEATURES = ['Temperature', 'Humidity', 'PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'Proximite_zones_industrielles', 'Densite_population']
+TARGET = 'Qualite_air'
+
+
+def _decimals(values, max_decimals=6):
+    """Plus petit nombre de décimales qui représente exactement au moins 99 % des valeurs"""
+    for digits in range(max_decimals + 1):
+        if np.mean(np.isclose(values, np.round(values, digits), rtol=0, atol=1e-9)) >= 0.99:
+            return digits
+    return max_decimals
+
+
+def _normal_scores(column):
+    """Rangs d'une colonne convertis en scores gaussiens (entrée de la copule)"""
+    return ndtri(rankdata(column) / (len(column) + 1))
+
+
+def fit_generator(data):
+    """
+    Apprend, pour chaque classe, les marges et la corrélation des caractéristiques
+
+    Args:
+        data (DataFrame): Jeu de référence (FEATURES + TARGET)
+
+    Returns:
+        dict: Paramètres du générateur (utilisés par sample_rows)
+    """
+    data = data.dropna(subset=[TARGET])
+    values = data[FEATURES].to_numpy(dtype=np.float64)
+    labels = data[TARGET].to_numpy()
+    classes, counts = np.unique(labels, return_counts=True)
+
+    per_class = []
+    for label in classes:
+        rows = values[labels == label]
+        complete = rows[~np.isnan(rows).any(axis=1)]
+
+        # Corrélation des scores gaussiens des rangs, ramenée à une matrice définie positive
+        scores = np.column_stack([_normal_scores(complete[:, j]) for j in range(len(FEATURES))])
+        correlation = np.nan_to_num(np.corrcoef(scores, rowvar=False))
+        np.fill_diagonal(correlation, 1.0)
+        eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+        correlation = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+        scale = np.sqrt(np.diag(correlation))
+        correlation /= np.outer(scale, scale)
+
+        per_class.append({
+            'label': label,
+            'quantiles': [np.sort(rows[~np.isnan(rows[:, j]), j]) for j in range(len(FEATURES))],
+            'cholesky': np.linalg.cholesky(correlation),
+            'missing_rate': np.isnan(rows).mean(axis=0)
+        })
+
+    return {
+        'classes': per_class,
+        'priors': counts / counts.sum(),
+        'decimals': [_decimals(values[~np.isnan(values[:, j]), j]) for j in range(len(FEATURES))],
+        'target_dtype': data[TARGET].dtype
+    }
+
+
+def sample_rows(generator, n_rows, rng):
+    """
+    Tire n_rows lignes synthétiques (ordre des classes mélangé)
+
+    Returns:
+        DataFrame: Colonnes FEATURES + TARGET
+    """
+    class_counts = rng.multinomial(n_rows, generator['priors'])
+    blocks, labels = [], []
+    for params, count in zip(generator['classes'], class_counts):
+        if count == 0:
+            continue
+        # Copule gaussienne: vecteur normal corrélé -> probabilités uniformes -> quantiles empiriques
+        uniform = ndtr(rng.standard_normal((count, len(FEATURES))) @ params['cholesky'].T)
+        block = np.empty((count, len(FEATURES)))
+        for j, sorted_values in enumerate(params['quantiles']):
+            positions = (np.arange(len(sorted_values)) + 0.5) / len(sorted_values)
+            block[:, j] = np.interp(uniform[:, j], positions, sorted_values)
+        block[rng.random(block.shape) < params['missing_rate']] = np.nan
+        blocks.append(block)
+        labels.append(np.full(count, params['label']))
+
+    order = rng.permutation(n_rows)
+    values = np.vstack(blocks)[order]
+    for j, digits in enumerate(generator['decimals']):
+        values[:, j] = np.round(values[:, j], digits)
+
+    frame = pd.DataFrame(values, columns=FEATURES)
+    frame[TARGET] = np.concatenate(labels)[order].astype(generator['target_dtype'])
+    return frame
+
+
+def generate_dataset(source, output, n_rows, seed=42, chunk_rows=100000):
+    """
+    Écrit un jeu de données synthétique de n_rows lignes, bloc par bloc
+
+    Args:
+        source (str): Jeu de référence (CSV au format de pollution.csv)
+        output (str): Fichier CSV à créer
+        n_rows (int): Nombre de lignes à générer
+        seed (int): Graine du générateur aléatoire
+        chunk_rows (int): Nombre de lignes générées et écrites à la fois
+
+    Returns:
+        str: Chemin du fichier écrit
+    """
+    generator = fit_generator(pd.read_csv(source))
+    # Un flux aléatoire indépendant par bloc, dérivé de la graine
+    streams = np.random.SeedSequence(seed).spawn((n_rows + chunk_rows - 1) // chunk_rows)
+
+    temp_path = f'{output}.tmp'
+    with open(temp_path, 'w', newline='') as f:
+        for index, stream in enumerate(streams):
+            count = min(chunk_rows, n_rows - index * chunk_rows)
+            sample_rows(generator, count, np.random.default_rng(stream)).to_csv(f, header=(index == 0), index=False)
+    os.replace(temp_path, output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un jeu de données de pollution synthétique")
+    parser.add_argument('--rows', type=int, required=True, help="Nombre de lignes à générer")
+    parser.add_argument('--output', required=True, help="Fichier CSV à créer")
+    parser.add_argument('--source', default='../data/pollution.csv', help="Jeu de référence")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    generate_dataset(args.source, args.output, args.rows, args.seed, args.chunk_rows)
+    print(f"✓ {args.rows} lignes générées dans: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
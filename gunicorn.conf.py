@@ -0,0 +1,24 @@
+"""
+Configuration gunicorn de l'API (voir wsgi.py).
+
+Les valeurs peuvent être surchargées par les variables d'environnement
+GUNICORN_BIND, GUNICORN_WORKERS, GUNICORN_THREADS et GUNICORN_TIMEOUT.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Les prédictions sont liées au CPU: un worker par cœur, quelques threads pour absorber les E/S
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+# Charger l'application (données + modèles) dans le maître avant le fork des workers
+preload_app = True
+
+
+def when_ready(server):
+    server.log.info("Maître prêt (pid %s): données et modèles préchargés, partagés avec les workers.", os.getpid())
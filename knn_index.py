@@ -0,0 +1,256 @@
+"""
+Index de plus proches voisins persisté pour le modèle KNN.
+
+L'index est construit une seule fois à l'entraînement et enregistré dans un
+dossier de fichiers .npy, projetés en mémoire (mmap) au chargement: les
+workers d'un même serveur partagent les mêmes pages, et rien n'est reconstruit
+quand le modèle est rechargé.
+
+Deux méthodes:
+  - exacte ('kd_tree', 'ball_tree'): arbre de scikit-learn dont les tableaux
+    sont enregistrés tels quels et restaurés sans reconstruction
+  - approchée ('ivf'): index à listes inversées. Un k-means répartit les points
+    en n_lists listes; une requête ne parcourt que les nprobe listes dont le
+    centre est le plus proche. Le rappel face à la recherche exacte est mesuré
+    à la construction.
+
+Les requêtes sont traitées par lots (distances calculées en une opération
+matricielle par liste et par lot), puis les voisins votent comme dans
+KNeighborsClassifier (poids uniformes ou inverses de la distance).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+INDEX_FORMAT_VERSION = 1
+TREE_METHODS = ('kd_tree', 'ball_tree')
+TREE_ARRAYS = ('data', 'idx_array', 'node_data', 'node_bounds')
+
+
+def _tree_class(method):
+    from sklearn.neighbors import BallTree, KDTree
+    return KDTree if method == 'kd_tree' else BallTree
+
+
+def build_index(path, X, y, method='kd_tree', leaf_size=40, metric='minkowski', p=2,
+                n_lists=None, seed=42):
+    """
+    Construit et enregistre un index dans le dossier path (écrit à part puis renommé)
+
+    Args:
+        X (ndarray): Points d'entraînement déjà mis à l'échelle
+        y (ndarray): Classes des points
+        method (str): 'kd_tree', 'ball_tree' ou 'ivf' (approché, distance euclidienne uniquement)
+        n_lists (int): Nombre de listes de l'index 'ivf' (défaut: racine carrée du nombre de points)
+
+    Returns:
+        float: Durée de construction en secondes
+    """
+    import sklearn
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    classes, y_encoded = np.unique(np.asarray(y), return_inverse=True)
+    meta = {'format_version': INDEX_FORMAT_VERSION, 'method': method, 'n_points': int(len(X)),
+            'n_features': int(X.shape[1]), 'sklearn_version': sklearn.__version__}
+
+    start = time.perf_counter()
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-index-')
+    try:
+        np.save(os.path.join(tmp_dir, 'classes.npy'), classes)
+        if method in TREE_METHODS:
+            tree = _tree_class(method)(X, leaf_size=leaf_size, metric=metric, p=p)
+            state = tree.__getstate__()
+            for name, array in zip(TREE_ARRAYS, state[:len(TREE_ARRAYS)]):
+                np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+            # Le reste de l'état (tailles, métrique) est petit; les tableaux restent des .npy projetables
+            joblib.dump(state[len(TREE_ARRAYS):], os.path.join(tmp_dir, 'tree_state.joblib'))
+            np.save(os.path.join(tmp_dir, 'labels.npy'), y_encoded)
+            meta.update({'leaf_size': leaf_size, 'metric': metric, 'p': p})
+        elif method == 'ivf':
+            centroids, assignment = _kmeans(X, n_lists or int(np.clip(np.sqrt(len(X)), 1, 4096)), seed)
+            order = np.argsort(assignment, kind='stable')
+            offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+            points = X[order]
+            np.save(os.path.join(tmp_dir, 'centroids.npy'), centroids)
+            np.save(os.path.join(tmp_dir, 'points.npy'), points)
+            np.save(os.path.join(tmp_dir, 'sq_norms.npy'), np.einsum('ij,ij->i', points, points))
+            np.save(os.path.join(tmp_dir, 'offsets.npy'), offsets)
+            np.save(os.path.join(tmp_dir, 'ids.npy'), order)
+            np.save(os.path.join(tmp_dir, 'labels.npy'), y_encoded)
+            meta.update({'n_lists': int(len(centroids))})
+        else:
+            raise ValueError(f"Méthode d'index inconnue: '{method}'.")
+
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.rename(tmp_dir, path)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return time.perf_counter() - start
+
+
+def _kmeans(X, n_lists, seed):
+    """Quantificateur grossier: centres k-means (appris sur un échantillon) et liste de chaque point"""
+    from sklearn.cluster import MiniBatchKMeans
+
+    rng = np.random.default_rng(seed)
+    sample = X[rng.choice(len(X), min(len(X), 256 * n_lists), replace=False)]
+    kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=seed, batch_size=4096, n_init=3).fit(sample)
+    assignment = np.concatenate([kmeans.predict(X[i:i + 100000]) for i in range(0, len(X), 100000)])
+    return kmeans.cluster_centers_.astype(np.float64), assignment
+
+
+class KNNIndex:
+    """Index enregistré par build_index, ouvert en lecture seule (tableaux projetés en mémoire)"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.method = self.meta['method']
+        load = lambda name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        self.classes = np.load(os.path.join(path, 'classes.npy'))
+        self.labels = load('labels')
+
+        if self.method in TREE_METHODS:
+            import sklearn
+
+            tree_class = _tree_class(self.method)
+            arrays = tuple(load(name) for name in TREE_ARRAYS)
+            if self.meta['sklearn_version'] == sklearn.__version__:
+                self.tree = tree_class.__new__(tree_class)
+                self.tree.__setstate__(arrays + tuple(joblib.load(os.path.join(path, 'tree_state.joblib'))))
+            else:
+                # Format interne de l'arbre propre à la version de scikit-learn: reconstruction depuis les points
+                self.tree = tree_class(np.asarray(arrays[0]), leaf_size=self.meta['leaf_size'],
+                                       metric=self.meta['metric'], p=self.meta['p'])
+        else:
+            self.centroids = np.load(os.path.join(path, 'centroids.npy'))
+            self.centroid_sq_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+            self.points, self.sq_norms, self.ids = load('points'), load('sq_norms'), load('ids')
+            self.offsets = np.load(os.path.join(path, 'offsets.npy'))
+
+    def kneighbors(self, X, k, nprobe=8, batch_size=1024):
+        """
+        k plus proches voisins de chaque ligne de X, par lots de batch_size lignes
+
+        Returns:
+            (distances (n, k) croissantes, identifiants des points d'entraînement (n, k))
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.meta['n_features'])
+        distances, ids = [], []
+        for start in range(0, len(X), batch_size):
+            batch = X[start:start + batch_size]
+            if self.method in TREE_METHODS:
+                d, i = self.tree.query(batch, k=k)
+            else:
+                d, i = self._query_ivf(batch, k, nprobe)
+            distances.append(d)
+            ids.append(i)
+        return np.vstack(distances), np.vstack(ids)
+
+    def _query_ivf(self, X, k, nprobe):
+        nprobe = min(nprobe, len(self.centroids))
+        sq = np.einsum('ij,ij->i', X, X)
+        centroid_d = sq[:, None] + self.centroid_sq_norms[None, :] - 2.0 * X @ self.centroids.T
+        probes = np.argpartition(centroid_d, nprobe - 1, axis=1)[:, :nprobe]
+
+        best_d = np.full((len(X), k), np.inf)
+        best_i = np.zeros((len(X), k), dtype=np.intp)
+        # Requêtes regroupées par liste sondée: une multiplication matricielle par liste
+        flat = probes.ravel()
+        order = np.argsort(flat, kind='stable')
+        lists, starts = np.unique(flat[order], return_index=True)
+        for list_id, group in zip(lists, np.split(order // nprobe, starts[1:])):
+            lo, hi = self.offsets[list_id], self.offsets[list_id + 1]
+            if hi == lo:
+                continue
+            d = sq[group, None] + self.sq_norms[lo:hi][None, :] - 2.0 * X[group] @ self.points[lo:hi].T
+            kk = min(k, hi - lo)
+            part = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+            merged_d = np.hstack([best_d[group], np.take_along_axis(d, part, axis=1)])
+            merged_i = np.hstack([best_i[group], part + lo])
+            keep = np.argpartition(merged_d, k - 1, axis=1)[:, :k]
+            best_d[group] = np.take_along_axis(merged_d, keep, axis=1)
+            best_i[group] = np.take_along_axis(merged_i, keep, axis=1)
+
+        order = np.argsort(best_d, axis=1)
+        best_d = np.sqrt(np.maximum(np.take_along_axis(best_d, order, axis=1), 0.0))
+        positions = np.take_along_axis(best_i, order, axis=1)
+        return best_d, np.where(np.isinf(best_d), -1, np.asarray(self.ids)[positions])
+
+    def predict(self, X, k, weights='uniform', nprobe=8, batch_size=1024):
+        """Classe prédite par vote des k voisins (comme KNeighborsClassifier.predict)"""
+        distances, ids = self.kneighbors(X, k, nprobe, batch_size)
+        neighbor_labels = np.where(ids < 0, -1, np.asarray(self.labels)[np.maximum(ids, 0)])
+        return self.classes[vote(distances, neighbor_labels, len(self.classes), weights)]
+
+
+def vote(distances, neighbor_labels, n_classes, weights='uniform'):
+    """Indice de la classe gagnante de chaque ligne (égalité: plus petit indice, comme scikit-learn)"""
+    if weights == 'distance':
+        with np.errstate(divide='ignore'):
+            w = 1.0 / distances
+        exact = distances == 0
+        # Points à distance nulle: poids 1 pour eux, 0 pour les autres voisins
+        w = np.where(exact.any(axis=1, keepdims=True), exact.astype(np.float64), w)
+    else:
+        w = np.ones_like(distances)
+    w = np.where(neighbor_labels < 0, 0.0, w)
+    counts = np.zeros((len(distances), n_classes))
+    rows = np.repeat(np.arange(len(distances)), distances.shape[1])
+    np.add.at(counts, (rows, np.maximum(neighbor_labels, 0).ravel()), w.ravel())
+    return np.argmax(counts, axis=1)
+
+
+def _without_self(distances, ids, self_ids, k):
+    """Retire de chaque ligne le point interrogé lui-même (ou, s'il n'y figure pas, le voisin le plus lointain)"""
+    is_self = ids == np.asarray(self_ids)[:, None]
+    drop = np.where(is_self.any(axis=1), is_self.argmax(axis=1), ids.shape[1] - 1)
+    keep = np.ones(ids.shape, dtype=bool)
+    keep[np.arange(len(ids)), drop] = False
+    return distances[keep].reshape(len(ids), -1)[:, :k], ids[keep].reshape(len(ids), -1)[:, :k]
+
+
+def recall_report(index, exact_index, X_queries, k, nprobe=8, weights='uniform', self_ids=None):
+    """
+    Rappel@k de l'index face à la recherche exacte, et accord des prédictions
+
+    Les requêtes doivent être des lignes hors de l'index: un point indexé est son propre plus proche voisin,
+    ce qui gonfle le rappel. Faute de telles lignes, passer des points indexés avec leurs identifiants
+    self_ids: chacun est alors exclu de ses propres voisins (leave-one-out).
+
+    Returns:
+        dict: recall_at_k, prediction_agreement, latence par requête (µs) des deux index
+    """
+    n_neighbors = k if self_ids is None else k + 1
+    start = time.perf_counter()
+    approx_d, approx_ids = index.kneighbors(X_queries, n_neighbors, nprobe)
+    approx_us = (time.perf_counter() - start) / max(len(X_queries), 1) * 1e6
+    start = time.perf_counter()
+    exact_d, exact_ids = exact_index.kneighbors(X_queries, n_neighbors)
+    exact_us = (time.perf_counter() - start) / max(len(X_queries), 1) * 1e6
+    if self_ids is not None:
+        approx_d, approx_ids = _without_self(approx_d, approx_ids, self_ids, k)
+        exact_d, exact_ids = _without_self(exact_d, exact_ids, self_ids, k)
+
+    hits = [len(np.intersect1d(a, e)) for a, e in zip(approx_ids, exact_ids)]
+    votes = [vote(d, np.where(i < 0, -1, np.asarray(idx.labels)[np.maximum(i, 0)]), len(idx.classes), weights)
+             for d, i, idx in ((approx_d, approx_ids, index), (exact_d, exact_ids, exact_index))]
+    return {
+        'k': k,
+        'nprobe': nprobe,
+        'queries': int(len(X_queries)),
+        'leave_one_out': self_ids is not None,
+        'recall_at_k': float(np.sum(hits) / (k * len(X_queries))) if len(X_queries) else 1.0,
+        'prediction_agreement': float(np.mean(votes[0] == votes[1])) if len(X_queries) else 1.0,
+        'query_us': approx_us,
+        'exact_query_us': exact_us
+    }
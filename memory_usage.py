@@ -0,0 +1,137 @@
+"""
+Mesure de la mémoire des processus de l'API (Linux, via /proc).
+
+- RSS: mémoire résidente, pages partagées comprises
+- PSS: part proportionnelle (une page partagée par N processus compte pour 1/N)
+- Shared / Private: pages résidentes partagées avec d'autres processus ou propres au processus
+
+Utilisation en ligne de commande, pour comparer les workers gunicorn:
+    python memory_usage.py <pid du maître gunicorn>
+"""
+
+import os
+import resource
+import sys
+
+_SMAPS_FIELDS = {
+    'Rss': 'rss_kb', 'Pss': 'pss_kb',
+    'Shared_Clean': 'shared_clean_kb', 'Shared_Dirty': 'shared_dirty_kb',
+    'Private_Clean': 'private_clean_kb', 'Private_Dirty': 'private_dirty_kb'
+}
+
+
+def process_memory(pid='self'):
+    """
+    Mémoire d'un processus en kilo-octets
+
+    Utilise /proc/<pid>/smaps_rollup si disponible, sinon le pic de RSS via getrusage.
+    """
+    usage = {'pid': os.getpid() if pid == 'self' else int(pid)}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                key = parts[0].rstrip(':')
+                if key in _SMAPS_FIELDS:
+                    usage[_SMAPS_FIELDS[key]] = int(parts[1])
+        usage['shared_kb'] = usage.get('shared_clean_kb', 0) + usage.get('shared_dirty_kb', 0)
+        usage['private_kb'] = usage.get('private_clean_kb', 0) + usage.get('private_dirty_kb', 0)
+    except (FileNotFoundError, PermissionError):
+        if pid != 'self':
+            raise
+        # Pas de /proc (macOS...): seul le pic de mémoire résidente est disponible
+        usage['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage
+
+
+def mapped_files(pid='self', prefix=None):
+    """
+    Mémoire des fichiers projetés (mmap) d'un processus, par fichier, en kilo-octets (/proc/<pid>/smaps)
+
+    Args:
+        prefix (str): Ne garder que les fichiers dont le chemin commence par prefix
+
+    Returns:
+        dict: chemin -> {'rss_kb', 'pss_kb', 'shared_kb', 'private_kb', 'deleted'}; vide sans /proc.
+        Un fichier remplacé depuis sa projection (ancienne version d'un modèle) est marqué 'deleted'.
+    """
+    files = {}
+    current = None
+    try:
+        with open(f'/proc/{pid}/smaps') as f:
+            for line in f:
+                parts = line.split()
+                # En-tête d'une projection: adresses perms offset périphérique inode [chemin]
+                if '-' in parts[0] and not parts[0].endswith(':'):
+                    path = line.split(None, 5)[5].strip() if len(parts) >= 6 else ''
+                    deleted = path.endswith(' (deleted)')
+                    path = path[:-len(' (deleted)')] if deleted else path
+                    if not path.startswith('/') or (prefix is not None and not path.startswith(prefix)):
+                        current = None
+                        continue
+                    current = files.setdefault((path, deleted), {field: 0 for field in _SMAPS_FIELDS.values()})
+                elif current is not None and parts[0].rstrip(':') in _SMAPS_FIELDS:
+                    current[_SMAPS_FIELDS[parts[0].rstrip(':')]] += int(parts[1])
+    except (FileNotFoundError, PermissionError):
+        return {}
+
+    report = {}
+    for (path, deleted), usage in files.items():
+        key = f'{path} (deleted)' if deleted else path
+        report[key] = {
+            'rss_kb': usage['rss_kb'],
+            'pss_kb': usage['pss_kb'],
+            'shared_kb': usage['shared_clean_kb'] + usage['shared_dirty_kb'],
+            'private_kb': usage['private_clean_kb'] + usage['private_dirty_kb'],
+            'deleted': deleted
+        }
+    return report
+
+
+def child_pids(pid):
+    """PID des processus enfants directs (ex. workers d'un maître gunicorn)"""
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # Le nom du processus peut contenir des espaces: on découpe après la parenthèse fermante
+                fields = f.read().rsplit(')', 1)[1].split()
+        except (FileNotFoundError, PermissionError):
+            continue
+        if int(fields[1]) == int(pid):
+            children.append(int(entry))
+    return sorted(children)
+
+
+def workers_report(master_pid):
+    """Mémoire du maître et de chacun de ses workers, avec le total réel (somme des PSS)"""
+    master = process_memory(master_pid)
+    workers = [process_memory(pid) for pid in child_pids(master_pid)]
+    total_pss = master['pss_kb'] + sum(w['pss_kb'] for w in workers)
+    return {
+        'master': master,
+        'workers': workers,
+        'total_pss_kb': total_pss,
+        # Ce que coûteraient les mêmes processus si chacun avait chargé ses données et modèles séparément
+        'independent_rss_kb': master['rss_kb'] + sum(w['rss_kb'] for w in workers)
+    }
+
+
+def main():
+    """Affiche la mémoire des workers d'un maître gunicorn"""
+    if len(sys.argv) != 2:
+        print(f"Usage: python {os.path.basename(__file__)} <pid du maître gunicorn>")
+        return
+    report = workers_report(sys.argv[1])
+    print(f"{'PID':>8} {'RSS (Mo)':>10} {'PSS (Mo)':>10} {'Partagé (Mo)':>13} {'Privé (Mo)':>11}")
+    for role, usage in [('maître', report['master'])] + [('worker', w) for w in report['workers']]:
+        print(f"{usage['pid']:>8} {usage['rss_kb'] / 1024:>10.1f} {usage['pss_kb'] / 1024:>10.1f} "
+              f"{usage['shared_kb'] / 1024:>13.1f} {usage['private_kb'] / 1024:>11.1f}  {role}")
+    print(f"\nMémoire totale réelle (somme des PSS): {report['total_pss_kb'] / 1024:.1f} Mo")
+    print(f"Somme des RSS (chargements indépendants): {report['independent_rss_kb'] / 1024:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
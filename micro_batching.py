@@ -0,0 +1,142 @@
+"""
+Micro-batching des prédictions unitaires concurrentes.
+
+Les requêtes /predict qui arrivent pour un même modèle pendant une courte
+fenêtre (ex. 2 ms) ou jusqu'à N lignes sont regroupées: une seule
+prédiction vectorisée est effectuée, puis chaque requête en attente reçoit
+son résultat. La taille des lots et le temps d'attente en file sont
+mesurés pour régler le compromis débit / latence.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _PendingPrediction:
+    """Une ligne en attente de prédiction et le résultat à renvoyer au thread de la requête"""
+
+    __slots__ = ('artifact', 'row', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, artifact, row):
+        self.artifact = artifact
+        self.row = row
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Regroupe les prédictions unitaires concurrentes d'un même modèle"""
+
+    def __init__(self, predict_fn, window_ms=2.0, max_batch_rows=64, stats_window=10000):
+        """
+        Args:
+            predict_fn (callable): predict_fn(artefact, matrice mise à l'échelle) -> tableau de prédictions
+            window_ms (float): Durée maximale d'attente d'autres requêtes après la première d'un lot
+            max_batch_rows (int): Taille maximale d'un lot
+            stats_window (int): Nombre de lots/requêtes récents conservés pour les percentiles
+        """
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_rows = max(1, int(max_batch_rows))
+        self._queues = {}
+        self._workers_pid = None
+        self._lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._queue_waits = deque(maxlen=stats_window)
+        self._totals = {'batches': 0, 'rows': 0, 'errors': 0}
+
+    def predict(self, model_name, artifact, row, timeout=30.0):
+        """
+        Met une ligne (déjà mise à l'échelle) en file et attend sa prédiction
+
+        Raises:
+            TimeoutError: si la prédiction n'est pas revenue à temps
+            Exception: l'erreur levée par predict_fn pour le lot
+        """
+        pending = _PendingPrediction(artifact, np.array(row, dtype=np.float64).reshape(-1))
+        self._queue_for(model_name).put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError("Délai dépassé en attente du micro-lot.")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def stats(self):
+        """Taille des lots et attente en file (moyenne, p50, p99, max) sur les lots récents"""
+        with self._lock:
+            sizes = np.array(self._batch_sizes, dtype=np.float64)
+            waits = np.array(self._queue_waits, dtype=np.float64) * 1000.0
+            totals = dict(self._totals)
+
+        def summary(values):
+            if values.size == 0:
+                return {'mean': 0.0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+            return {'mean': float(values.mean()), 'p50': float(np.percentile(values, 50)),
+                    'p99': float(np.percentile(values, 99)), 'max': float(values.max())}
+
+        return {
+            **totals,
+            'window_ms': self.window * 1000.0,
+            'max_batch_rows': self.max_batch_rows,
+            'mean_rows_per_batch': totals['rows'] / totals['batches'] if totals['batches'] else 0.0,
+            'batch_size': summary(sizes),
+            'queue_wait_ms': summary(waits)
+        }
+
+    def _queue_for(self, model_name):
+        with self._lock:
+            # Après un fork (workers gunicorn), les threads du parent n'existent plus: on repart de zéro
+            if self._workers_pid != os.getpid():
+                self._queues = {}
+                self._workers_pid = os.getpid()
+            q = self._queues.get(model_name)
+            if q is None:
+                q = self._queues[model_name] = queue.Queue()
+                threading.Thread(target=self._worker, args=(q,), name=f'microbatch-{model_name}', daemon=True).start()
+            return q
+
+    def _worker(self, q):
+        while True:
+            batch = [q.get()]
+            deadline = batch[0].enqueued_at + self.window
+            while len(batch) < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            started = time.perf_counter()
+            # Un réentraînement pendant la fenêtre peut mêler deux versions du modèle: un sous-lot par artefact
+            groups = {}
+            for pending in batch:
+                groups.setdefault(id(pending.artifact), []).append(pending)
+            errors = 0
+            for group in groups.values():
+                try:
+                    predictions = self.predict_fn(group[0].artifact, np.vstack([p.row for p in group]))
+                    for pending, prediction in zip(group, predictions):
+                        pending.result = prediction
+                except Exception as e:
+                    errors += 1
+                    for pending in group:
+                        pending.error = e
+                finally:
+                    for pending in group:
+                        pending.done.set()
+
+            with self._lock:
+                self._totals['batches'] += 1
+                self._totals['rows'] += len(batch)
+                self._totals['errors'] += errors
+                self._batch_sizes.append(len(batch))
+                self._queue_waits.extend(started - p.enqueued_at for p in batch)
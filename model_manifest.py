@@ -0,0 +1,105 @@
+"""
+Manifeste des modèles entraînés (MODELS_DIR/manifest.json).
+
+Le manifeste décrit chaque modèle publié: version, taille des fichiers, durée
+d'entraînement, métriques, empreinte des données et latence d'inférence. Il
+est mis à jour à chaque publication, sous un verrou de fichier (plusieurs
+processus d'entraînement peuvent publier en même temps) et de façon atomique
+(écrit à part puis renommé): un lecteur voit toujours un manifeste complet.
+
+ManifestCache le sert depuis la mémoire: le fichier n'est relu que si sa date
+de modification ou sa taille change, et son ETag (empreinte du contenu servi)
+permet aux clients de revalider leur copie par une réponse 304.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from artifacts import atomic_write_json, file_lock
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_FORMAT_VERSION = 1
+
+
+def manifest_path(models_dir):
+    return os.path.join(models_dir, MANIFEST_FILENAME)
+
+
+def read_manifest(models_dir):
+    """Manifeste enregistré, ou None s'il n'existe pas encore"""
+    try:
+        with open(manifest_path(models_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(models_dir, manifest):
+    atomic_write_json(manifest, manifest_path(models_dir), indent=2, sort_keys=True, default=str)
+
+
+def update_manifest(models_dir, model_name, entry=None, rebuild=None):
+    """
+    Met à jour l'entrée d'un modèle (ou la retire si entry est None), sous verrou et de façon atomique
+
+    Args:
+        rebuild (callable): rebuild() -> {nom: entrée}, appelée si le manifeste n'existe pas encore
+            (modèles entraînés avant son introduction)
+
+    Returns:
+        dict: Manifeste enregistré
+    """
+    with file_lock(manifest_path(models_dir) + '.lock'):
+        manifest = read_manifest(models_dir)
+        if manifest is None:
+            manifest = {'format_version': MANIFEST_FORMAT_VERSION, 'models': rebuild() if rebuild else {}}
+        if entry is None:
+            manifest['models'].pop(model_name, None)
+        else:
+            manifest['models'][model_name] = entry
+        _write_manifest(models_dir, manifest)
+    return manifest
+
+
+class ManifestCache:
+    """Manifeste gardé en mémoire avec sa sérialisation et son ETag, relu seulement quand le fichier change"""
+
+    def __init__(self, models_dir, render, rebuild=None):
+        """
+        Args:
+            render (callable): render(manifeste) -> corps de la réponse (dictionnaire sérialisable en JSON)
+            rebuild (callable): rebuild() -> {nom: entrée}, pour créer le manifeste s'il n'existe pas
+        """
+        self.models_dir = models_dir
+        self.render = render
+        self.rebuild = rebuild
+        self._lock = threading.Lock()
+        self._signature = None
+        self._body = None
+        self._etag = None
+
+    def get(self):
+        """
+        Returns:
+            (corps JSON en octets, ETag)
+        """
+        path = manifest_path(self.models_dir)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with file_lock(path + '.lock'):
+                if not os.path.exists(path):
+                    _write_manifest(self.models_dir, {'format_version': MANIFEST_FORMAT_VERSION,
+                                                      'models': self.rebuild() if self.rebuild else {}})
+            stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        with self._lock:
+            if signature != self._signature:
+                manifest = read_manifest(self.models_dir) or {'models': {}}
+                self._body = json.dumps(self.render(manifest), sort_keys=True, default=str).encode('utf-8')
+                self._etag = hashlib.sha256(self._body).hexdigest()[:32]
+                self._signature = signature
+            return self._body, self._etag
@@ -0,0 +1,136 @@
+"""
+Registre en mémoire des modèles entraînés pour l'API Flask.
+
+Chaque fichier MODELS_DIR/<nom>.pkl n'est désérialisé qu'une seule fois puis
+conservé en mémoire (politique LRU avec taille maximale). Le fichier n'est
+rechargé que si sa date de modification ou son empreinte SHA-256 change.
+La fonction de chargement est configurable (ex. artifacts.load_artifact, qui
+projette les tableaux en mémoire au lieu de les copier).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+
+from data_cache import file_fingerprint
+
+
+class ModelRegistry:
+    """Cache LRU des modèles sauvegardés, partagé par toutes les requêtes du processus"""
+
+    def __init__(self, models_dir, max_size=6, loader=joblib.load):
+        """
+        Initialise le registre
+
+        Args:
+            models_dir (str): Dossier contenant les fichiers .pkl
+            max_size (int): Nombre maximal de modèles gardés en mémoire
+            loader (callable): loader(chemin) -> modèle chargé
+        """
+        self.models_dir = models_dir
+        self.max_size = max(1, int(max_size))
+        self.loader = loader
+        # nom -> (modèle, (mtime_ns, taille), empreinte sha256)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._counters = {'hits': 0, 'misses': 0, 'reloads': 0, 'evictions': 0}
+
+    def model_path(self, model_name):
+        """Chemin du fichier .pkl d'un modèle"""
+        return os.path.join(self.models_dir, f'{model_name}.pkl')
+
+    def get(self, model_name):
+        """
+        Retourne le modèle demandé, en le chargeant depuis le disque si nécessaire
+
+        Raises:
+            FileNotFoundError: si le modèle n'a pas encore été entraîné
+        """
+        path = self.model_path(model_name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(model_name)
+            raise
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry is not None and entry[1] == signature:
+                self._entries.move_to_end(model_name)
+                self._counters['hits'] += 1
+                return entry[0]
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        # Un verrou par modèle: deux requêtes simultanées ne désérialisent pas deux fois le même fichier,
+        # et le chargement d'un gros modèle ne bloque pas les prédictions des autres.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(model_name)
+                if entry is not None and entry[1] == signature:
+                    self._entries.move_to_end(model_name)
+                    self._counters['hits'] += 1
+                    return entry[0]
+
+            digest = file_fingerprint(path)
+
+            with self._lock:
+                # Fichier touché mais contenu identique: inutile de le désérialiser à nouveau
+                if entry is not None and entry[2] == digest:
+                    self._entries[model_name] = (entry[0], signature, digest)
+                    self._entries.move_to_end(model_name)
+                    self._counters['hits'] += 1
+                    return entry[0]
+
+            model = self.loader(path)
+
+            with self._lock:
+                self._counters['reloads' if entry is not None else 'misses'] += 1
+                self._entries[model_name] = (model, signature, digest)
+                self._entries.move_to_end(model_name)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._counters['evictions'] += 1
+            return model
+
+    def preload(self):
+        """
+        Charge tous les modèles présents dans le dossier (dans la limite de max_size)
+
+        Returns:
+            list: Noms des modèles chargés
+        """
+        names = sorted(f[:-len('.pkl')] for f in os.listdir(self.models_dir) if f.endswith('.pkl'))
+        loaded = []
+        for model_name in names[:self.max_size]:
+            try:
+                self.get(model_name)
+                loaded.append(model_name)
+            except FileNotFoundError:
+                continue
+        return loaded
+
+    def loaded(self):
+        """Modèles actuellement en mémoire: nom -> modèle chargé (sans compter d'accès)"""
+        with self._lock:
+            return {name: entry[0] for name, entry in self._entries.items()}
+
+    def invalidate(self, model_name):
+        """Retire un modèle du registre (il sera rechargé au prochain accès)"""
+        with self._lock:
+            self._entries.pop(model_name, None)
+
+    def stats(self):
+        """Compteurs de succès/échecs/rechargements et contenu actuel du registre"""
+        with self._lock:
+            total = self._counters['hits'] + self._counters['misses'] + self._counters['reloads']
+            return {
+                **self._counters,
+                'hit_rate': self._counters['hits'] / total if total else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'loaded_models': list(self._entries.keys())
+            }
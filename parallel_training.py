@@ -0,0 +1,89 @@
+"""
+Entraînement parallèle de plusieurs modèles sur des données en mémoire partagée.
+
+Les matrices d'entraînement et de test sont copiées une seule fois dans des
+segments multiprocessing.shared_memory; chaque processus du pool s'y attache
+par nom au lieu de recevoir une copie sérialisée des tableaux.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory, get_context, get_all_start_methods
+
+import numpy as np
+
+_START_METHOD = 'fork' if 'fork' in get_all_start_methods() else 'spawn'
+
+
+def _share_array(array):
+    """Copie un tableau dans un segment de mémoire partagée et retourne (segment, descripteur)"""
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach_array(descriptor):
+    """Vue numpy (sans copie) sur un segment partagé décrit par (nom, forme, dtype)"""
+    name, shape, dtype = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _run_on_shared(func, name, descriptors):
+    """Exécuté dans un processus du pool: attache les tableaux partagés puis appelle func"""
+    segments, arrays = [], {}
+    try:
+        for key, descriptor in descriptors.items():
+            shm, arrays[key] = _attach_array(descriptor)
+            segments.append(shm)
+        start = time.perf_counter()
+        result = func(name, **arrays)
+        return result, time.perf_counter() - start
+    finally:
+        arrays.clear()
+        for shm in segments:
+            shm.close()
+
+
+def run_parallel(func, names, arrays, max_workers=None, report=None):
+    """
+    Appelle func(nom, **arrays) pour chaque nom, en parallèle sur plusieurs cœurs
+
+    Args:
+        func (callable): Fonction de niveau module (sérialisable) func(nom, **arrays)
+        names (list): Noms passés un à un à func (ex. noms de modèles)
+        arrays (dict): Tableaux numpy partagés entre tous les processus
+        max_workers (int): Nombre de processus (par défaut: min(len(names), nombre de cœurs))
+        report (callable): report(progression, étape) appelé après chaque nom terminé
+
+    Returns:
+        (résultats, erreurs, durée murale): résultats[nom] = {'result', 'seconds'}, erreurs[nom] = message
+    """
+    max_workers = max_workers or min(len(names), os.cpu_count() or 1)
+    segments, descriptors = [], {}
+    results, errors = {}, {}
+    wall_start = time.perf_counter()
+    try:
+        for key, array in arrays.items():
+            shm, descriptors[key] = _share_array(array)
+            segments.append(shm)
+
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context(_START_METHOD)) as pool:
+            futures = {pool.submit(_run_on_shared, func, name, descriptors): name for name in names}
+            for done, future in enumerate(as_completed(futures), start=1):
+                name = futures[future]
+                try:
+                    result, seconds = future.result()
+                    results[name] = {'result': result, 'seconds': seconds}
+                except Exception as e:
+                    errors[name] = f"{type(e).__name__}: {e}"
+                if report is not None:
+                    report(done / len(names), f"{name} terminé ({done}/{len(names)})")
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+    return results, errors, time.perf_counter() - wall_start
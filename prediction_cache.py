@@ -0,0 +1,146 @@
+"""
+Cache des résultats de /predict, indexé par vecteur de caractéristiques arrondi.
+
+Les capteurs envoient souvent des mesures identiques ou quasi identiques
+(ex. PM2.5 ou CO répétés au dixième près). Chaque caractéristique peut être
+arrondie à une précision configurable avant la prédiction: deux lectures qui
+ne diffèrent qu'au-delà de cette précision partagent la même entrée.
+
+La clé contient la version du modèle: un modèle réentraîné (nouvelle version)
+ne peut jamais servir un résultat calculé avec l'ancienne, et les entrées de
+l'ancienne version sont purgées dès que la nouvelle est rencontrée.
+Politique d'éviction LRU avec taille maximale et durée de vie (TTL).
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def parse_precision(spec, features):
+    """
+    Lit une configuration de précision « PM2.5=1,CO=1 » (nombre de décimales par caractéristique)
+
+    Returns:
+        list: Nombre de décimales par caractéristique, dans l'ordre de features (None = valeur exacte)
+
+    Raises:
+        ValueError: caractéristique inconnue ou nombre de décimales invalide
+    """
+    decimals = dict.fromkeys(features)
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, value = item.rpartition('=')
+        if name not in decimals:
+            raise ValueError(f"Caractéristique inconnue dans la précision du cache: '{name}'.")
+        try:
+            decimals[name] = int(value)
+        except ValueError:
+            raise ValueError(f"Nombre de décimales invalide pour '{name}': '{value}'.") from None
+    return [decimals[name] for name in features]
+
+
+class PredictionCache:
+    """Cache LRU + TTL des prédictions, partagé par toutes les requêtes du processus"""
+
+    def __init__(self, max_size=10000, ttl_seconds=300.0, decimals=None):
+        """
+        Args:
+            max_size (int): Nombre maximal d'entrées conservées
+            ttl_seconds (float): Durée de vie d'une entrée (0 = sans expiration)
+            decimals (list): Nombre de décimales par caractéristique (None = valeur exacte)
+        """
+        self.max_size = max(1, int(max_size))
+        self.ttl = float(ttl_seconds)
+        self.decimals = list(decimals) if decimals is not None else None
+        # (modèle, version, valeurs arrondies) -> (prédiction, expiration, taille estimée en octets)
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'expirations': 0, 'evictions': 0, 'invalidations': 0}
+
+    def quantize(self, values):
+        """Arrondit chaque valeur à la précision de sa caractéristique"""
+        if self.decimals is None:
+            return tuple(values)
+        return tuple(value if digits is None else round(value, digits)
+                     for value, digits in zip(values, self.decimals))
+
+    def get(self, model_name, version, quantized):
+        """
+        Retourne la prédiction en cache, ou None (absente ou expirée)
+
+        Une version différente de la dernière vue pour ce modèle signifie qu'il a été
+        réentraîné: toutes ses entrées précédentes sont purgées.
+        """
+        key = (model_name, version, quantized)
+        with self._lock:
+            if self._versions.get(model_name, version) != version:
+                self._drop_model(model_name)
+            self._versions[model_name] = version
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            if self.ttl > 0 and entry[1] < time.monotonic():
+                self._remove(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[0]
+
+    def put(self, model_name, version, quantized, prediction):
+        """Enregistre une prédiction (éviction de l'entrée la moins récemment utilisée si plein)"""
+        key = (model_name, version, quantized)
+        size = sys.getsizeof(key) + sys.getsizeof(quantized) + sum(sys.getsizeof(v) for v in quantized) \
+            + sys.getsizeof(prediction)
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else float('inf')
+        with self._lock:
+            if self._versions.get(model_name, version) != version:
+                # Résultat calculé avec une version déjà remplacée: ne pas le garder
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (prediction, expires, size)
+            self._memory_bytes += size
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+
+    def invalidate(self, model_name=None):
+        """Supprime les entrées d'un modèle (ou de tous les modèles)"""
+        with self._lock:
+            if model_name is None:
+                self._counters['invalidations'] += len(self._entries)
+                self._entries.clear()
+                self._versions.clear()
+                self._memory_bytes = 0
+            else:
+                self._drop_model(model_name)
+                self._versions.pop(model_name, None)
+
+    def stats(self):
+        """Taux de succès, compteurs et mémoire estimée des entrées"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'hit_rate': self._counters['hits'] / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'memory_bytes': self._memory_bytes
+            }
+
+    def _remove(self, key):
+        self._memory_bytes -= self._entries.pop(key)[2]
+
+    def _drop_model(self, model_name):
+        stale = [key for key in self._entries if key[0] == model_name]
+        for key in stale:
+            self._remove(key)
+        self._counters['invalidations'] += len(stale)
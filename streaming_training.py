@@ -0,0 +1,152 @@
+"""
+Entraînement hors mémoire (out-of-core) sur un fichier CSV lu par blocs.
+
+Le fichier n'est jamais chargé en entier: seules quelques lignes (chunk_rows)
+sont en mémoire à la fois.
+  1. Premier passage: StandardScaler.partial_fit sur les lignes d'entraînement,
+     et inventaire des classes.
+  2. Passages d'entraînement (epochs): chaque bloc est mis à l'échelle, mélangé,
+     puis transmis à estimator.partial_fit (GaussianNB, SGDClassifier, ...).
+  3. Dernier passage: évaluation sur le flux réservé, accumulée dans une
+     matrice de confusion dont sont tirées les métriques.
+
+Les lignes réservées à l'évaluation sont celles dont le numéro est un multiple
+de holdout_modulo (une ligne sur 5 par défaut, soit 20 % comme test_size=0.2):
+le partage ne dépend que de la position de la ligne, pas de la taille des blocs.
+Les valeurs manquantes sont remplacées par la moyenne de la caractéristique
+(la médiane, utilisée par le chargement complet, ne se calcule pas en un passage).
+"""
+
+import time
+
+import numpy as np
+
+
+def _read_chunks(data_path, features, target, chunk_rows):
+    """Blocs (numéros de ligne, X, y) du fichier, sans les lignes sans classe ni valeurs aberrantes"""
+    import pandas as pd
+
+    offset = 0
+    for chunk in pd.read_csv(data_path, usecols=features + [target], chunksize=chunk_rows):
+        row_ids = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        X = chunk[features].to_numpy(dtype=np.float64)
+        y = chunk[target].to_numpy()
+        # Même filtre que le chargement complet (les NaN sont conservés puis imputés)
+        keep = ~pd.isna(y) & ~(X <= -1000).any(axis=1)
+        yield row_ids[keep], X[keep], y[keep]
+
+
+def _scale(X, scaler):
+    X = np.where(np.isnan(X), scaler.mean_, X)
+    return (X - scaler.mean_) / scaler.scale_
+
+
+def metrics_from_confusion(confusion):
+    """
+    Métriques pondérées (comme average='weighted' de scikit-learn) tirées d'une matrice de confusion
+
+    Returns:
+        dict: accuracy, precision, recall, f1_score, confusion_matrix
+    """
+    confusion = np.asarray(confusion, dtype=np.float64)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    true_positive = np.diag(confusion)
+    total = support.sum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, true_positive / predicted, 0.0)
+        recall = np.where(support > 0, true_positive / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    weights = support / total if total else support
+    return {
+        'accuracy': float(true_positive.sum() / total) if total else 0.0,
+        'precision': float(np.sum(weights * precision)),
+        'recall': float(np.sum(weights * recall)),
+        'f1_score': float(np.sum(weights * f1)),
+        'confusion_matrix': confusion.astype(np.int64).tolist()
+    }
+
+
+def train_streaming(estimator, data_path, features, target, chunk_rows=100000, epochs=1,
+                    holdout_modulo=5, seed=42, sample_rows=1000, report=None):
+    """
+    Entraîne un estimateur incrémental sur un CSV lu par blocs
+
+    Args:
+        estimator: Estimateur non entraîné qui implémente partial_fit
+        data_path (str): Fichier CSV (colonnes features + target)
+        features (list): Caractéristiques, dans l'ordre attendu par le modèle
+        target (str): Colonne de la classe
+        chunk_rows (int): Nombre de lignes lues à la fois
+        epochs (int): Nombre de passages d'entraînement sur le fichier
+        holdout_modulo (int): Une ligne sur holdout_modulo est réservée à l'évaluation
+        seed (int): Graine du mélange des lignes dans chaque bloc
+        sample_rows (int): Nombre de lignes d'évaluation mises à l'échelle retournées (vérification du modèle compilé)
+        report (callable): report(progression entre 0 et 1, étape)
+
+    Returns:
+        dict: model, scaler, metrics, sample, train_rows, holdout_rows, chunks, epochs, fit_seconds
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    report = report or (lambda progress, stage: None)
+    total_passes = epochs + 2
+
+    # 1. Scaler et inventaire des classes
+    report(0.0, "Passage 1: mise à l'échelle")
+    scaler = StandardScaler()
+    classes = set()
+    train_rows = holdout_rows = chunks = 0
+    for row_ids, X, y in _read_chunks(data_path, features, target, chunk_rows):
+        train = row_ids % holdout_modulo != 0
+        if train.any():
+            scaler.partial_fit(X[train])
+        classes.update(np.unique(y).tolist())
+        train_rows += int(train.sum())
+        holdout_rows += int((~train).sum())
+        chunks += 1
+    if train_rows == 0:
+        raise ValueError("Aucune ligne d'entraînement dans le fichier de données.")
+    classes = np.array(sorted(classes))
+
+    # 2. Entraînement incrémental
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        report((1 + epoch) / total_passes, f"Passage {2 + epoch}: entraînement (époque {epoch + 1}/{epochs})")
+        for row_ids, X, y in _read_chunks(data_path, features, target, chunk_rows):
+            train = row_ids % holdout_modulo != 0
+            if not train.any():
+                continue
+            order = rng.permutation(int(train.sum()))
+            estimator.partial_fit(_scale(X[train], scaler)[order], y[train][order], classes=classes)
+    fit_seconds = time.perf_counter() - start
+
+    # 3. Évaluation sur le flux réservé
+    report((1 + epochs) / total_passes, f"Passage {2 + epochs}: évaluation")
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    sample = []
+    for row_ids, X, y in _read_chunks(data_path, features, target, chunk_rows):
+        holdout = row_ids % holdout_modulo == 0
+        if not holdout.any():
+            continue
+        X_holdout = _scale(X[holdout], scaler)
+        y_pred = estimator.predict(X_holdout)
+        np.add.at(confusion, (np.searchsorted(classes, y[holdout]), np.searchsorted(classes, y_pred)), 1)
+        if sum(len(s) for s in sample) < sample_rows:
+            sample.append(X_holdout[:sample_rows])
+
+    return {
+        'model': estimator,
+        'scaler': scaler,
+        'metrics': metrics_from_confusion(confusion),
+        'sample': np.vstack(sample)[:sample_rows] if sample else np.empty((0, len(features))),
+        'train_rows': train_rows,
+        'holdout_rows': holdout_rows,
+        'chunks': chunks,
+        'epochs': epochs,
+        'fit_seconds': fit_seconds
+    }
@@ -0,0 +1,365 @@
+"""
+File d'attente des tâches d'entraînement exécutées en arrière-plan.
+
+Chaque tâche s'exécute dans un processus séparé afin de ne pas bloquer les
+threads du serveur Flask. Le nombre de tâches simultanées est limité; les
+autres attendent dans une file. Les processus enfants remontent leur
+progression, leur résultat ou leur erreur par un tube (Pipe).
+
+L'état des tâches est partagé par tous les processus du serveur (workers
+gunicorn) à travers le dossier jobs_dir:
+  - <id>.json:  description de la tâche (écrite à part puis renommée)
+  - <id>.task:  fonction et arguments d'une tâche en attente
+  - <id>.cancel: demande d'annulation d'une tâche en cours dans un autre worker
+  - state.json: file d'attente et tâches en cours (avec le PID du worker qui
+    les exécute), modifié seulement sous un verrou de fichier
+Une tâche soumise à un worker peut donc être suivie ou annulée depuis
+n'importe quel autre, et la limite de tâches simultanées vaut pour toute la
+machine. Le dispatcher de chaque worker prend les tâches en attente dans la
+limite de cette capacité; celui qui lance une tâche en publie la progression.
+"""
+
+import atexit
+import json
+import multiprocessing as mp
+import os
+import pickle
+import threading
+import time
+import traceback
+import uuid
+from multiprocessing.connection import wait
+
+from artifacts import atomic_write_bytes, atomic_write_json, file_lock
+
+# 'fork' permet aux enfants d'hériter des données d'entraînement déjà chargées sans les sérialiser
+_START_METHOD = 'fork' if 'fork' in mp.get_all_start_methods() else 'spawn'
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Levée lorsque la file d'attente des tâches est pleine"""
+
+
+def _run_job(conn, target, args):
+    """Point d'entrée du processus enfant: exécute la tâche et renvoie le résultat au parent"""
+
+    def report(progress, stage):
+        conn.send(('progress', float(progress), stage))
+
+    try:
+        result = target(*args, report=report)
+        conn.send(('result', result))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobManager:
+    """Gestionnaire des tâches d'entraînement asynchrones, partagé par les processus du serveur"""
+
+    def __init__(self, jobs_dir, max_concurrent=2, max_pending=20, max_history=200):
+        """
+        Args:
+            jobs_dir (str): Dossier de l'état partagé des tâches
+            max_concurrent (int): Nombre maximal de tâches exécutées en même temps (tous workers confondus)
+            max_pending (int): Nombre maximal de tâches en attente
+            max_history (int): Nombre de tâches terminées conservées pour consultation
+        """
+        self.jobs_dir = jobs_dir
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_pending = max(0, int(max_pending))
+        self.max_history = max_history
+        self._ctx = mp.get_context(_START_METHOD)
+        self._running = {}  # tâches lancées par ce processus: job_id -> (processus, extrémité parent du tube, description)
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self._dispatcher_pid = None
+        atexit.register(self.shutdown)
+
+    # --- API publique ---
+
+    def submit(self, kind, target, args=(), **info):
+        """
+        Ajoute une tâche à la file et retourne sa description
+
+        Raises:
+            JobQueueFull: si la file d'attente est pleine
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'kind': kind,
+            **info,
+            'status': QUEUED,
+            'progress': 0.0,
+            'stage': "En attente",
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        with self._shared_lock():
+            state = self._read_state()
+            if len(state['queued']) >= self.max_pending and len(state['running']) >= self.max_concurrent:
+                raise JobQueueFull(f"File d'attente pleine ({self.max_pending} tâches en attente).")
+            atomic_write_bytes(pickle.dumps((target, args)), self._path(job_id, '.task'))
+            self._write_job(job)
+            state['queued'].append(job_id)
+            self._write_state(state)
+        self._ensure_dispatcher()
+        return job
+
+    def get(self, job_id):
+        """Description courante d'une tâche, ou None si elle est inconnue"""
+        self._ensure_dispatcher()
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        return self._read_job(job_id)
+
+    def list(self):
+        """Description de toutes les tâches connues, de la plus ancienne à la plus récente"""
+        self._ensure_dispatcher()
+        return self._all_jobs()
+
+    def cancel(self, job_id):
+        """
+        Annule une tâche en attente ou en cours d'exécution
+
+        Une tâche en cours dans un autre worker reçoit une demande d'annulation ('cancel_requested'):
+        ce worker l'interrompt dans les instants qui suivent. Retourne la description de la tâche,
+        ou None si elle est inconnue.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with self._shared_lock():
+            state = self._read_state()
+            if job_id in state['queued']:
+                state['queued'].remove(job_id)
+                self._write_state(state)
+                self._remove(job_id, '.task')
+                return self._finish(self._read_job(job_id), CANCELLED)
+
+        with self._lock:
+            if job_id in self._running:
+                return self._stop_local(job_id, CANCELLED)
+        job = self._read_job(job_id)
+        if job['status'] == RUNNING:
+            open(self._path(job_id, '.cancel'), 'w').close()
+            job['cancel_requested'] = True
+        return job
+
+    def stats(self):
+        """Nombre de tâches par statut et limites configurées"""
+        counts = {}
+        for job in self.list():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {
+            'counts': counts,
+            'max_concurrent': self.max_concurrent,
+            'max_pending': self.max_pending
+        }
+
+    def shutdown(self):
+        """Termine les processus lancés par ce worker (appelé à la sortie de l'interpréteur)"""
+        with self._lock:
+            for job_id in list(self._running):
+                self._stop_local(job_id, CANCELLED)
+
+    # --- État partagé ---
+
+    def _path(self, job_id, suffix):
+        return os.path.join(self.jobs_dir, f'{job_id}{suffix}')
+
+    def _shared_lock(self):
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        return file_lock(os.path.join(self.jobs_dir, '.lock'))
+
+    def _read_state(self):
+        try:
+            with open(os.path.join(self.jobs_dir, 'state.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'queued': [], 'running': {}}
+
+    def _write_state(self, state):
+        atomic_write_json(state, os.path.join(self.jobs_dir, 'state.json'))
+
+    def _read_job(self, job_id):
+        try:
+            with open(self._path(job_id, '.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_job(self, job):
+        atomic_write_json(job, self._path(job['job_id'], '.json'), default=str)
+
+    def _remove(self, job_id, suffix):
+        try:
+            os.unlink(self._path(job_id, suffix))
+        except FileNotFoundError:
+            pass
+
+    def _finish(self, job, status, **fields):
+        job.update(fields)
+        job['status'] = status
+        job['finished_at'] = time.time()
+        job.pop('cancel_requested', None)
+        self._write_job(job)
+        return job
+
+    def _all_jobs(self):
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        jobs = [self._read_job(name[:-len('.json')]) for name in os.listdir(self.jobs_dir)
+                if name.endswith('.json') and name != 'state.json' and not name.startswith('.')]
+        return sorted((job for job in jobs if job is not None), key=lambda job: job['created_at'])
+
+    def _prune_history(self):
+        finished = [job for job in self._all_jobs() if job['status'] in FINISHED_STATUSES]
+        for job in finished[:max(0, len(finished) - self.max_history)]:
+            self._remove(job['job_id'], '.json')
+
+    # --- Fonctionnement interne ---
+
+    def _ensure_dispatcher(self):
+        # Le thread n'est démarré qu'au premier usage, et redémarré après un fork
+        # (les threads ne survivent pas dans un processus enfant, ex. workers gunicorn).
+        with self._lock:
+            if self._dispatcher is not None and self._dispatcher_pid == os.getpid() and self._dispatcher.is_alive():
+                return
+            if self._dispatcher_pid != os.getpid():
+                self._running = {}  # processus lancés par le parent: pas les nôtres
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name='training-jobs', daemon=True)
+            self._dispatcher_pid = os.getpid()
+            self._dispatcher.start()
+
+    def _claim_pending(self):
+        """Réserve les tâches en attente que la capacité libre permet de lancer (et libère celles des workers disparus)"""
+        claimed = []
+        with self._shared_lock():
+            state = self._read_state()
+            for job_id, owner in list(state['running'].items()):
+                if owner != os.getpid() and not _pid_alive(owner):
+                    del state['running'][job_id]
+                    job = self._read_job(job_id)
+                    if job is not None and job['status'] == RUNNING:
+                        self._finish(job, FAILED, error=f"Worker {owner} arrêté pendant la tâche.", stage="Échec")
+            while state['queued'] and len(state['running']) < self.max_concurrent:
+                job_id = state['queued'].pop(0)
+                try:
+                    with open(self._path(job_id, '.task'), 'rb') as f:
+                        task = pickle.load(f)
+                except Exception as e:
+                    # Tâche illisible (fichier absent, fonction introuvable, ...): échec, sans occuper de place
+                    self._remove(job_id, '.task')
+                    job = self._read_job(job_id)
+                    if job is not None:
+                        self._finish(job, FAILED, error=f"Tâche illisible: {type(e).__name__}: {e}", stage="Échec")
+                    continue
+                self._remove(job_id, '.task')
+                state['running'][job_id] = os.getpid()
+                claimed.append((job_id, task))
+            self._write_state(state)
+        return claimed
+
+    def _start(self, job_id, target, args):
+        """Lance une tâche réservée; si elle ne peut pas démarrer, elle échoue et libère sa place"""
+        job = self._read_job(job_id)
+        if job is None:
+            self._release(job_id)
+            return
+        try:
+            parent_conn, child_conn = self._ctx.Pipe(duplex=False)
+            process = self._ctx.Process(target=_run_job, args=(child_conn, target, args), name=f"job-{job_id[:8]}")
+            process.start()
+        except Exception as e:
+            self._finish(job, FAILED, error=f"Lancement impossible: {type(e).__name__}: {e}", stage="Échec")
+            self._release(job_id)
+            return
+        child_conn.close()
+        job.update(status=RUNNING, started_at=time.time(), stage="Démarrage")
+        self._write_job(job)
+        self._running[job_id] = (process, parent_conn, job)
+
+    def _release(self, job_id):
+        with self._shared_lock():
+            state = self._read_state()
+            state['running'].pop(job_id, None)
+            self._write_state(state)
+            self._remove(job_id, '.cancel')
+            self._prune_history()
+
+    def _stop_local(self, job_id, status, **fields):
+        process, conn, job = self._running.pop(job_id)
+        process.terminate()
+        process.join(timeout=5)
+        conn.close()
+        job = self._finish(job, status, **fields)
+        self._release(job_id)
+        return job
+
+    def _handle_message(self, job_id, message):
+        job = self._running[job_id][2]
+        if message[0] == 'progress':
+            job['progress'], job['stage'] = message[1], message[2]
+            self._write_job(job)
+        elif message[0] == 'result':
+            self._finish(job, SUCCEEDED, result=message[1], progress=1.0, stage="Terminé")
+        elif message[0] == 'error':
+            self._finish(job, FAILED, error=message[1], traceback=message[2], stage="Échec")
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                capacity = self.max_concurrent - len(self._running)
+            if capacity > 0:
+                for job_id, (target, args) in self._claim_pending():
+                    with self._lock:
+                        self._start(job_id, target, args)
+
+            with self._lock:
+                # Demandes d'annulation reçues par d'autres workers
+                for job_id in [j for j in self._running if os.path.exists(self._path(j, '.cancel'))]:
+                    self._stop_local(job_id, CANCELLED)
+                conns = {conn: job_id for job_id, (_, conn, _) in self._running.items()}
+
+            ready = wait(list(conns), timeout=0.2) if conns else []
+            if not conns:
+                time.sleep(0.2)
+
+            with self._lock:
+                for conn in ready:
+                    job_id = conns[conn]
+                    if job_id not in self._running:
+                        continue  # annulée entre-temps
+                    process, _, job = self._running[job_id]
+                    try:
+                        while conn.poll():
+                            self._handle_message(job_id, conn.recv())
+                    except (EOFError, OSError):
+                        # Le processus s'est terminé (normalement ou non)
+                        process.join(timeout=5)
+                        if job['status'] == RUNNING:
+                            self._finish(job, FAILED, error=f"Processus interrompu (code de sortie {process.exitcode}).",
+                                         stage="Échec")
+                    if job['status'] in FINISHED_STATUSES:
+                        del self._running[job_id]
+                        process.join(timeout=5)
+                        conn.close()
+                        self._release(job_id)
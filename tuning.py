@@ -0,0 +1,113 @@
+"""
+Recherche d'hyperparamètres par divisions successives (successive halving).
+
+HalvingRandomSearchCV évalue d'abord de nombreuses configurations sur peu de
+lignes, puis ne garde qu'un tiers des meilleures à chaque itération en leur
+donnant trois fois plus de données: la plupart des candidats sont éliminés
+pour une fraction du coût d'une recherche exhaustive. Les validations croisées
+s'exécutent sur tous les cœurs (n_jobs=-1).
+
+Le résultat (rapport et meilleur estimateur réentraîné) est mis en cache dans
+CACHE_DIR/tuning, indexé par (modèle, grille, empreinte des données, réglages
+de la recherche): relancer la même recherche ne coûte rien.
+"""
+
+import hashlib
+import json
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from artifacts import atomic_dump
+
+
+def tuning_key(model_name, param_grid, data_fingerprint, settings):
+    """Clé de cache d'une recherche: empreinte SHA-256 de ses entrées"""
+    payload = json.dumps({'model': model_name, 'grid': param_grid, 'data': data_fingerprint, 'settings': settings},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def validate_grid(estimator, param_grid):
+    """
+    Vérifie une grille {paramètre: liste de valeurs} pour un estimateur
+
+    Raises:
+        ValueError: grille vide, paramètre inconnu ou liste de valeurs vide
+    """
+    if not isinstance(param_grid, dict) or not param_grid:
+        raise ValueError("La grille doit être un dictionnaire non vide {paramètre: liste de valeurs}.")
+    valid = estimator.get_params()
+    for name, values in param_grid.items():
+        if name not in valid:
+            raise ValueError(f"Paramètre inconnu pour {type(estimator).__name__}: '{name}'.")
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Le paramètre '{name}' doit avoir une liste non vide de valeurs.")
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, 'tuning', f'{key}.joblib')
+
+
+def load_cached(cache_dir, key):
+    """Rapport et meilleur estimateur d'une recherche déjà faite, ou None"""
+    try:
+        return joblib.load(_cache_path(cache_dir, key))
+    except (FileNotFoundError, EOFError, ValueError):
+        return None
+
+
+def save_cached(cache_dir, key, report, estimator):
+    """Met en cache le rapport et le meilleur estimateur d'une recherche"""
+    os.makedirs(os.path.join(cache_dir, 'tuning'), exist_ok=True)
+    atomic_dump({'report': report, 'estimator': estimator}, _cache_path(cache_dir, key))
+
+
+def run_search(estimator, param_grid, X, y, scoring='f1_weighted', cv=5, random_state=42, n_jobs=-1, top=10):
+    """
+    Lance HalvingRandomSearchCV et résume la recherche
+
+    Returns:
+        (meilleur estimateur réentraîné sur X, y; rapport)
+    """
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV
+
+    search = HalvingRandomSearchCV(estimator, param_grid, scoring=scoring, cv=cv, factor=3,
+                                   random_state=random_state, n_jobs=n_jobs, refit=True)
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # Grille plus petite que le nombre de candidats possible: tous les candidats sont simplement évalués
+        warnings.filterwarnings('ignore', message='The total space of parameters', category=UserWarning)
+        search.fit(X, y)
+    search_seconds = time.perf_counter() - start
+
+    results = search.cv_results_
+    last = results['iter'] == results['iter'].max()
+    # Candidats des dernières itérations d'abord, puis par score (un ajustement en échec a un score NaN)
+    scores = np.nan_to_num(results['mean_test_score'], nan=-np.inf)
+    order = sorted(range(len(results['params'])), key=lambda i: (-results['iter'][i], -scores[i]))
+    report = {
+        'best_params': search.best_params_,
+        'best_cv_score': float(search.best_score_),
+        'scoring': scoring,
+        'cv': cv,
+        'search_seconds': search_seconds,
+        'refit_seconds': float(search.refit_time_),
+        'n_candidates': [int(n) for n in search.n_candidates_],
+        'n_resources': [int(n) for n in search.n_resources_],
+        'n_iterations': int(search.n_iterations_),
+        'finalists': int(last.sum()),
+        'top_candidates': [{
+            'params': results['params'][i],
+            'iteration': int(results['iter'][i]),
+            'n_resources': int(results['n_resources'][i]),
+            'mean_test_score': float(results['mean_test_score'][i]),
+            'std_test_score': float(results['std_test_score'][i]),
+            'mean_fit_time': float(results['mean_fit_time'][i])
+        } for i in order[:top]]
+    }
+    return search.best_estimator_, report
@@ -0,0 +1,25 @@
+"""
+Point d'entrée WSGI de production (gunicorn).
+
+Le maître gunicorn importe ce module une seule fois avant de créer ses workers
+(preload_app = True dans gunicorn.conf.py): les données, le scaler et tous les
+modèles entraînés sont chargés dans le maître, puis partagés par copie à
+l'écriture (copy-on-write) entre les workers au lieu d'être rechargés par chacun.
+
+Lancement:
+    gunicorn -c gunicorn.conf.py
+"""
+
+import gc
+
+import api
+
+# Chargement (et préchauffage des modèles si WARMUP_ENABLED=1) synchrones: les threads
+# d'arrière-plan ne survivent pas au fork des workers
+app = api.create_app(background=False)
+preloaded_models = api.registry.preload()
+
+# Les objets chargés jusqu'ici ne seront plus parcourus par le ramasse-miettes: sinon la mise à
+# jour de leurs en-têtes GC dans chaque worker recopierait les pages partagées avec le maître.
+gc.collect()
+gc.freeze()